@@ -6,16 +6,17 @@ __version__ = "0.1.0"
 __author__ = "GPT Genius Team"
 __email__ = "contact@gpt-genius.com"
 
-# Imports principaux pour une utilisation simple du package
-try:
-    from gpt_genius.core.ai import AI
-    from gpt_genius.core.files_dict import FilesDict  
-    from gpt_genius.core.prompt import Prompt
-    from gpt_genius.core.base_agent import BaseAgent
-    from gpt_genius.core.default.simple_agent import SimpleAgent
-except ImportError:
-    # Les imports peuvent échouer lors de l'installation
-    pass
+from gpt_genius._lazy import lazy_exports
+
+# Imports principaux pour une utilisation simple du package, chargés à la demande
+# (PEP 562) pour ne pas importer LangChain tant que l'IA n'est pas utilisée
+_LAZY_IMPORTS = {
+    "AI": "gpt_genius.core.ai",
+    "FilesDict": "gpt_genius.core.files_dict",
+    "Prompt": "gpt_genius.core.prompt",
+    "BaseAgent": "gpt_genius.core.base_agent",
+    "SimpleAgent": "gpt_genius.core.default.simple_agent",
+}
 
 __all__ = [
     "AI",
@@ -26,4 +27,6 @@ __all__ = [
     "__version__",
     "__author__",
     "__email__",
-]
\ No newline at end of file
+]
+
+__getattr__, __dir__ = lazy_exports(globals(), _LAZY_IMPORTS)
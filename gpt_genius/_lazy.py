@@ -0,0 +1,36 @@
+"""
+Exports chargés à la demande (PEP 562), partagés par les `__init__` du package.
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    namespace: Dict[str, Any], lazy_imports: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Construit les fonctions `__getattr__` et `__dir__` d'un module dont certains
+    exports ne sont importés qu'au premier accès.
+
+    Args:
+        namespace: Les `globals()` du module, où `__all__` est déjà défini ;
+            chaque export chargé y est mémorisé pour les accès suivants
+        lazy_imports: La correspondance entre nom exporté et module qui le définit
+
+    Returns:
+        Le couple (`__getattr__`, `__dir__`) à affecter dans le module
+    """
+    module_name = namespace["__name__"]
+
+    def __getattr__(name: str) -> Any:
+        if name not in lazy_imports:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(lazy_imports[name]), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(namespace["__all__"]))
+
+    return __getattr__, __dir__
@@ -9,6 +9,7 @@ Le module fournit des fonctionnalités pour :
 - Gérer la génération ou l'amélioration de projets de code.
 """
 
+import functools
 import logging
 import os
 import sys
@@ -22,6 +23,7 @@ from termcolor import colored
 from gpt_genius.core.ai import AI
 from gpt_genius.core.default.disk_execution_env import DiskExecutionEnv
 from gpt_genius.core.default.disk_memory import DiskMemory
+from gpt_genius.core.default.file_store import FileStore
 from gpt_genius.core.default.paths import PREPROMPTS_PATH, memory_path
 from gpt_genius.core.default.simple_agent import SimpleAgent
 from gpt_genius.core.files_dict import FilesDict
@@ -33,28 +35,25 @@ app = typer.Typer(
 )
 
 
+@functools.lru_cache(maxsize=1)
 def load_env_if_needed():
     """
-    Charge les variables d'environnement si OPENAI_API_KEY n'est pas déjà définie.
+    Charge les variables d'environnement si les clés d'API ne sont pas déjà définies.
 
-    Cette fonction vérifie si la variable d'environnement OPENAI_API_KEY est définie,
-    et si ce n'est pas le cas, elle tente de la charger depuis un fichier .env dans le
-    répertoire de travail courant. Elle définit ensuite openai.api_key pour une utilisation
-    dans l'application.
+    Cette fonction vérifie si les variables d'environnement OPENAI_API_KEY et
+    ANTHROPIC_API_KEY sont définies, et si ce n'est pas le cas, elle tente de les
+    charger depuis un fichier .env, puis depuis le fichier .env du répertoire de
+    travail courant. Elle définit ensuite openai.api_key pour une utilisation
+    dans l'application. Le chargement n'est effectué qu'une fois par processus.
     """
-    # Nous avons toutes ces vérifications pour des raisons héritées...
-    if os.getenv("OPENAI_API_KEY") is None:
+    needed = ("OPENAI_API_KEY", "ANTHROPIC_API_KEY")
+    if any(os.getenv(key) is None for key in needed):
         load_dotenv()
-    if os.getenv("OPENAI_API_KEY") is None:
-        load_dotenv(dotenv_path=os.path.join(os.getcwd(), ".env"))
+        if any(os.getenv(key) is None for key in needed):
+            load_dotenv(dotenv_path=os.path.join(os.getcwd(), ".env"))
 
     openai.api_key = os.getenv("OPENAI_API_KEY")
 
-    if os.getenv("ANTHROPIC_API_KEY") is None:
-        load_dotenv()
-    if os.getenv("ANTHROPIC_API_KEY") is None:
-        load_dotenv(dotenv_path=os.path.join(os.getcwd(), ".env"))
-
 
 def load_prompt(
     input_repo: DiskMemory,
@@ -186,23 +185,21 @@ def main(
     memory.archive_logs()
 
     execution_env = DiskExecutionEnv()
+    files = FileStore(project_path)
     agent = SimpleAgent(
         memory=memory,
         execution_env=execution_env,
         ai=ai,
         preprompts_holder=preprompts_holder,
+        file_store=files,
     )
 
     if improve_mode:
         print("Mode amélioration pas encore implémenté dans cette version simplifiée.")
         print("Utilisation du mode génération à la place...")
-        files_dict = agent.init(prompt)
-    else:
-        files_dict = agent.init(prompt)
-
-    # Sauvegarder les fichiers
-    from gpt_genius.core.default.file_store import FileStore
-    files = FileStore(project_path)
+    files_dict = agent.init(prompt)
+    # Les fichiers de code sont déjà écrits au fil du streaming ; cette
+    # sauvegarde finale ajoute le point d'entrée et garantit l'état final.
     files.push(files_dict)
 
     if ai.token_usage_log.is_openai_model():
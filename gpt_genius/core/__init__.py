@@ -2,12 +2,18 @@
 Modules principaux de GPT Genius.
 """
 
-from gpt_genius.core.ai import AI
-from gpt_genius.core.base_agent import BaseAgent
-from gpt_genius.core.base_execution_env import BaseExecutionEnv
-from gpt_genius.core.base_memory import BaseMemory
-from gpt_genius.core.files_dict import FilesDict
-from gpt_genius.core.prompt import Prompt
+from gpt_genius._lazy import lazy_exports
+
+# Exports chargés à la demande (PEP 562) pour éviter d'importer LangChain
+# lorsque seuls les modules légers sont utilisés
+_LAZY_IMPORTS = {
+    "AI": "gpt_genius.core.ai",
+    "BaseAgent": "gpt_genius.core.base_agent",
+    "BaseExecutionEnv": "gpt_genius.core.base_execution_env",
+    "BaseMemory": "gpt_genius.core.base_memory",
+    "FilesDict": "gpt_genius.core.files_dict",
+    "Prompt": "gpt_genius.core.prompt",
+}
 
 __all__ = [
     "AI",
@@ -16,4 +22,6 @@ __all__ = [
     "BaseMemory",
     "FilesDict",
     "Prompt",
-]
\ No newline at end of file
+]
+
+__getattr__, __dir__ = lazy_exports(globals(), _LAZY_IMPORTS)
@@ -9,16 +9,19 @@ les erreurs de limite de taux de l'API OpenAI.
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
 import logging
 import os
+import time
 from pathlib import Path
 from typing import Any, List, Optional, Union
 
 import backoff
 import openai
-import pyperclip
 
+from langchain.callbacks.base import BaseCallbackHandler
 from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
 from langchain.chat_models.base import BaseChatModel
 from langchain.schema import (
@@ -28,17 +31,253 @@ from langchain.schema import (
     messages_from_dict,
     messages_to_dict,
 )
-from langchain_anthropic import ChatAnthropic
-from langchain_openai import AzureChatOpenAI, ChatOpenAI
+from langchain_openai import ChatOpenAI
 
 from gpt_genius.core.token_usage import TokenUsageLog
 
+# orjson est nettement plus rapide que json pour les historiques de messages
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 # Type hint pour un message de chat
 Message = Union[AIMessage, HumanMessage, SystemMessage]
 
 # Configuration du logging
 logger = logging.getLogger(__name__)
 
+# Correspondance entre les types de messages LangChain et les rôles de l'API OpenAI
+_OPENAI_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+# Statuts terminaux d'un batch OpenAI qui ne produiront jamais de résultats
+_BATCH_FAILED_STATUSES = ("failed", "expired", "cancelled")
+# Intervalle par défaut (en secondes) entre deux vérifications du statut d'un batch
+BATCH_POLL_INTERVAL = 10
+
+# Erreurs transitoires pour lesquelles une nouvelle tentative a une chance d'aboutir
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+_RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def _openai_role(message: Message) -> str:
+    """
+    Retourne le rôle de l'API OpenAI correspondant à un message LangChain.
+
+    Args:
+        message: Le message à envoyer
+
+    Returns:
+        Le rôle OpenAI du message
+
+    Raises:
+        ValueError: Si le type du message n'est pas supporté par le mode batch
+    """
+    try:
+        return _OPENAI_ROLES[message.type]
+    except KeyError:
+        raise ValueError(
+            f"Type de message '{message.type}' non supporté par l'API Batch"
+        ) from None
+
+
+def _giveup(error: Exception) -> bool:
+    """
+    Indique si une erreur HTTP ne mérite pas de nouvelle tentative.
+
+    Les erreurs de connexion n'ont pas de code de statut et sont toujours retentées.
+
+    Args:
+        error: L'exception levée par l'appel au LLM
+
+    Returns:
+        True s'il faut abandonner, False sinon
+    """
+    status_code = getattr(error, "status_code", None)
+    return status_code is not None and status_code not in _RETRYABLE_STATUS_CODES
+
+
+def _retry_after_extra_wait(details: dict) -> float:
+    """
+    Calcule l'attente supplémentaire nécessaire pour respecter l'en-tête Retry-After.
+
+    Args:
+        details: Les détails de la tentative fournis par backoff
+
+    Returns:
+        Le nombre de secondes à attendre en plus du délai calculé par backoff
+    """
+    response = getattr(details["exception"], "response", None)
+    if response is None:
+        return 0.0
+    try:
+        retry_after = float(response.headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+    return max(0.0, retry_after - details["wait"])
+
+
+def _sleep_retry_after(details: dict) -> None:
+    time.sleep(_retry_after_extra_wait(details))
+
+
+async def _asleep_retry_after(details: dict) -> None:
+    await asyncio.sleep(_retry_after_extra_wait(details))
+
+
+# Marqueurs de nom de modèle signalant le support de la vision
+_VISION_MARKERS = ("vision-preview", "gpt-4o", "claude")
+_TURBO_NON_PREVIEW = "gpt-4-turbo"
+
+
+def _is_vision(model_name: str) -> bool:
+    """
+    Détermine si un modèle supporte la vision d'après son nom.
+
+    Args:
+        model_name: Le nom du modèle
+
+    Returns:
+        True si le modèle accepte des images en entrée
+    """
+    return any(marker in model_name for marker in _VISION_MARKERS) or (
+        _TURBO_NON_PREVIEW in model_name and "preview" not in model_name
+    )
+
+
+def _mk_azure(model_name, temperature, azure_endpoint, streaming) -> BaseChatModel:
+    from langchain_openai import AzureChatOpenAI
+
+    return AzureChatOpenAI(
+        azure_endpoint=azure_endpoint,
+        openai_api_version=os.getenv("OPENAI_API_VERSION", "2024-05-01-preview"),
+        deployment_name=model_name,
+        openai_api_type="azure",
+        streaming=streaming,
+        callbacks=[StreamingStdOutCallbackHandler()],
+    )
+
+
+def _mk_claude(model_name, temperature, azure_endpoint, streaming) -> BaseChatModel:
+    from langchain_anthropic import ChatAnthropic
+
+    return ChatAnthropic(
+        model=model_name,
+        temperature=temperature,
+        callbacks=[StreamingStdOutCallbackHandler()],
+        streaming=streaming,
+        max_tokens_to_sample=4096,
+    )
+
+
+def _mk_vision_openai(
+    model_name, temperature, azure_endpoint, streaming
+) -> BaseChatModel:
+    return ChatOpenAI(
+        model=model_name,
+        temperature=temperature,
+        streaming=streaming,
+        callbacks=[StreamingStdOutCallbackHandler()],
+        max_tokens=4096,  # les modèles de vision ont par défaut des limites de tokens faibles
+    )
+
+
+def _mk_openai(model_name, temperature, azure_endpoint, streaming) -> BaseChatModel:
+    return ChatOpenAI(
+        model=model_name,
+        temperature=temperature,
+        streaming=streaming,
+        callbacks=[StreamingStdOutCallbackHandler()],
+    )
+
+
+_LLM_BUILDERS = {
+    "azure": _mk_azure,
+    "claude": _mk_claude,
+    "vision": _mk_vision_openai,
+    "default": _mk_openai,
+}
+
+
+# Variables d'environnement lues par les clients LangChain à leur construction
+# (clés d'API, endpoints, version d'API) : elles font partie de la clé du cache
+_LLM_ENV_VARS = (
+    "OPENAI_API_KEY",
+    "OPENAI_API_BASE",
+    "OPENAI_BASE_URL",
+    "OPENAI_ORG_ID",
+    "OPENAI_ORGANIZATION",
+    "OPENAI_PROXY",
+    "OPENAI_API_VERSION",
+    "AZURE_OPENAI_API_KEY",
+    "AZURE_OPENAI_AD_TOKEN",
+    "AZURE_OPENAI_ENDPOINT",
+    "ANTHROPIC_API_KEY",
+    "ANTHROPIC_API_URL",
+)
+
+
+def _build_llm(
+    model_name: str,
+    temperature: float,
+    azure_endpoint: Optional[str],
+    streaming: bool,
+    vision: bool,
+) -> BaseChatModel:
+    """
+    Crée un modèle de chat pour une configuration donnée, mis en cache par
+    configuration et par valeur des variables d'environnement qu'il lit.
+
+    Args:
+        model_name: Le nom du modèle à utiliser
+        temperature: La température à utiliser pour le modèle
+        azure_endpoint: L'endpoint Azure optionnel
+        streaming: Utiliser le streaming ou non
+        vision: Support de la vision ou non
+
+    Returns:
+        Le modèle de chat créé
+    """
+    env = tuple(os.environ.get(name) for name in _LLM_ENV_VARS)
+    return _build_llm_cached(
+        model_name, temperature, azure_endpoint, streaming, vision, env
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _build_llm_cached(
+    model_name: str,
+    temperature: float,
+    azure_endpoint: Optional[str],
+    streaming: bool,
+    vision: bool,
+    env: tuple,
+) -> BaseChatModel:
+    """
+    Crée le modèle de chat ; `env` ne sert qu'à la clé du cache : un changement
+    de clé d'API ou d'endpoint produit un nouveau client.
+    """
+    if azure_endpoint:
+        kind = "azure"
+    elif "claude" in model_name:
+        kind = "claude"
+    elif vision:
+        kind = "vision"
+    else:
+        kind = "default"
+    return _LLM_BUILDERS[kind](model_name, temperature, azure_endpoint, streaming)
+
 
 class AI:
     """
@@ -56,6 +295,7 @@ class AI:
         azure_endpoint=None,
         streaming=True,
         vision=False,
+        batch: Optional[bool] = None,
     ):
         """
         Initialise la classe AI.
@@ -66,23 +306,36 @@ class AI:
             azure_endpoint: L'endpoint Azure optionnel
             streaming: Utiliser le streaming ou non
             vision: Support de la vision ou non
+            batch: Faire passer `next` par l'API Batch d'OpenAI ; par défaut,
+                activé par la variable d'environnement GPT_GENIUS_BATCH=1
         """
         self.temperature = temperature
         self.azure_endpoint = azure_endpoint
         self.model_name = model_name
         self.streaming = streaming
-        self.vision = (
-            ("vision-preview" in model_name)
-            or ("gpt-4-turbo" in model_name and "preview" not in model_name)
-            or ("claude" in model_name)
-            or ("gpt-4o" in model_name)
-        )
+        self.vision = _is_vision(model_name)
+        if batch is None:
+            batch = os.getenv("GPT_GENIUS_BATCH") == "1"
+        # L'API Batch d'OpenAI coûte deux fois moins cher mais n'est pas interactive
+        self.batch = batch and not azure_endpoint and "claude" not in model_name
+        if self.batch:
+            logger.warning(
+                "Mode batch activé : les complétions passent par l'API Batch "
+                "d'OpenAI (réponses sous 24h, sans streaming ni callbacks)"
+            )
         self.llm = self._create_chat_model()
         self.token_usage_log = TokenUsageLog(model_name)
 
         logger.debug(f"Utilisation du modèle {self.model_name}")
 
-    def start(self, system: str, user: Any, *, step_name: str) -> List[Message]:
+    def start(
+        self,
+        system: str,
+        user: Any,
+        *,
+        step_name: str,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> List[Message]:
         """
         Démarre la conversation avec un message système et un message utilisateur.
 
@@ -90,6 +343,7 @@ class AI:
             system: Le contenu du message système
             user: Le contenu du message utilisateur
             step_name: Le nom de l'étape
+            callbacks: Gestionnaires de callbacks supplémentaires pour cet appel
 
         Returns:
             La liste des messages dans la conversation
@@ -98,9 +352,9 @@ class AI:
             SystemMessage(content=system),
             HumanMessage(content=user),
         ]
-        return self.next(messages, step_name=step_name)
+        return self.next(messages, step_name=step_name, callbacks=callbacks)
 
-    def _extract_content(self, content):
+    def _extract_content(self, content, _str=str, _list=list):
         """
         Extrait le contenu textuel d'un message, supportant les types string et list.
         
@@ -110,13 +364,15 @@ class AI:
         Returns:
             Le contenu textuel extrait
         """
-        if isinstance(content, str):
+        # `type(...) is` évite le parcours du MRO d'isinstance ; les builtins liés en
+        # arguments par défaut sont des variables locales. Cas courant : une chaîne.
+        if type(content) is _str:
             return content
-        elif isinstance(content, list) and content and "text" in content[0]:
+        if type(content) is _list and content:
             # Assumant la structure du contenu liste est [{'type': 'text', 'text': 'Du texte'}, ...]
-            return content[0]["text"]
-        else:
-            return ""
+            first = content[0]
+            return first["text"] if "text" in first else ""
+        return ""
 
     def _collapse_text_messages(self, messages: List[Message]):
         """
@@ -133,22 +389,26 @@ class AI:
         if not messages:
             return collapsed_messages
 
+        extract_content = self._extract_content
         previous_message = messages[0]
-        combined_content = self._extract_content(previous_message.content)
+        contents = [extract_content(previous_message.content)]
 
         for current_message in messages[1:]:
+            content = current_message.content
+            if type(content) is not str:
+                content = extract_content(content)
             if current_message.type == previous_message.type:
-                combined_content += "\n\n" + self._extract_content(
-                    current_message.content
-                )
+                contents.append(content)
             else:
                 collapsed_messages.append(
-                    previous_message.__class__(content=combined_content)
+                    previous_message.__class__(content="\n\n".join(contents))
                 )
                 previous_message = current_message
-                combined_content = self._extract_content(current_message.content)
+                contents = [content]
 
-        collapsed_messages.append(previous_message.__class__(content=combined_content))
+        collapsed_messages.append(
+            previous_message.__class__(content="\n\n".join(contents))
+        )
         return collapsed_messages
 
     def next(
@@ -157,6 +417,7 @@ class AI:
         prompt: Optional[str] = None,
         *,
         step_name: str,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
     ) -> List[Message]:
         """
         Fait avancer la conversation en envoyant l'historique des messages 
@@ -166,10 +427,95 @@ class AI:
             messages: La liste des messages dans la conversation
             prompt: Le prompt à utiliser, par défaut None
             step_name: Le nom de l'étape
+            callbacks: Gestionnaires de callbacks supplémentaires pour cet appel,
+                ignorés en mode batch
 
         Returns:
             La liste mise à jour des messages dans la conversation
         """
+        messages = self._prepare_messages(messages, prompt)
+        if self.batch:
+            response = self._complete_batch([messages])[0]
+        else:
+            response = self.backoff_inference(messages, callbacks)
+        return self._record_response(messages, response, step_name)
+
+    async def anext(
+        self,
+        messages: List[Message],
+        prompt: Optional[str] = None,
+        *,
+        step_name: str,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> List[Message]:
+        """
+        Version asynchrone de `next`, permettant de lancer plusieurs complétions 
+        indépendantes en parallèle.
+
+        En mode batch, la conversation passe par l'API Batch comme avec `next` ;
+        l'attente du batch se fait dans un thread, sans bloquer la boucle d'événements.
+
+        Args:
+            messages: La liste des messages dans la conversation
+            prompt: Le prompt à utiliser, par défaut None
+            step_name: Le nom de l'étape
+            callbacks: Gestionnaires de callbacks supplémentaires pour cet appel,
+                ignorés en mode batch
+
+        Returns:
+            La liste mise à jour des messages dans la conversation
+        """
+        messages = self._prepare_messages(messages, prompt)
+        if self.batch:
+            response = (await asyncio.to_thread(self._complete_batch, [messages]))[0]
+        else:
+            response = await self.abackoff_inference(messages, callbacks)
+        return self._record_response(messages, response, step_name)
+
+    async def abatch(
+        self, conversations: List[List[Message]], *, step_name: str
+    ) -> List[List[Message]]:
+        """
+        Fait avancer plusieurs conversations indépendantes de façon concurrente.
+
+        En mode batch, toutes les conversations sont soumises dans un seul batch.
+
+        Args:
+            conversations: La liste des historiques de messages à compléter
+            step_name: Le nom de l'étape
+
+        Returns:
+            Les conversations mises à jour, dans le même ordre que l'entrée
+        """
+        if self.batch:
+            prepared = [self._prepare_messages(m, None) for m in conversations]
+            responses = await asyncio.to_thread(self._complete_batch, prepared)
+            return [
+                self._record_response(messages, response, step_name)
+                for messages, response in zip(prepared, responses)
+            ]
+        return list(
+            await asyncio.gather(
+                *[
+                    self.anext(messages, step_name=step_name)
+                    for messages in conversations
+                ]
+            )
+        )
+
+    def _prepare_messages(
+        self, messages: List[Message], prompt: Optional[str]
+    ) -> List[Message]:
+        """
+        Ajoute le prompt éventuel et prépare les messages avant l'envoi au LLM.
+
+        Args:
+            messages: La liste des messages dans la conversation
+            prompt: Le prompt à ajouter, ou None
+
+        Returns:
+            La liste des messages à envoyer au LLM
+        """
         if prompt:
             messages.append(HumanMessage(content=prompt))
 
@@ -180,9 +526,22 @@ class AI:
 
         if not self.vision:
             messages = self._collapse_text_messages(messages)
+        return messages
 
-        response = self.backoff_inference(messages)
+    def _record_response(
+        self, messages: List[Message], response: AIMessage, step_name: str
+    ) -> List[Message]:
+        """
+        Journalise l'usage des tokens et ajoute la réponse à la conversation.
 
+        Args:
+            messages: La liste des messages envoyés au LLM
+            response: La réponse du LLM
+            step_name: Le nom de l'étape
+
+        Returns:
+            La liste mise à jour des messages dans la conversation
+        """
         self.token_usage_log.update_log(
             messages=messages, answer=response.content, step_name=step_name
         )
@@ -191,23 +550,177 @@ class AI:
 
         return messages
 
-    @backoff.on_exception(backoff.expo, openai.RateLimitError, max_tries=7, max_time=45)
-    def backoff_inference(self, messages):
+    @backoff.on_exception(
+        backoff.expo,
+        _RETRYABLE_ERRORS,
+        max_tries=7,
+        max_time=45,
+        jitter=backoff.full_jitter,
+        giveup=_giveup,
+        on_backoff=_sleep_retry_after,
+    )
+    def backoff_inference(self, messages, callbacks=None):
         """
         Effectue l'inférence en utilisant le modèle de langage tout en implémentant 
         une stratégie de backoff exponentiel.
 
         Args:
             messages: Une liste de messages de chat qui seront passés au modèle de langage
+            callbacks: Gestionnaires de callbacks propres à cet appel ; ils sont
+                passés via la configuration pour ne pas modifier le modèle partagé
 
         Returns:
             La sortie du modèle de langage après traitement des messages fournis
 
         Raises:
-            openai.error.RateLimitError: Si le nombre de tentatives dépasse le maximum ou 
+            openai.RateLimitError: Si le nombre de tentatives dépasse le maximum ou 
             si la limite de taux persiste au-delà du temps alloué
+            openai.APIConnectionError: Si la connexion échoue de façon persistante
+        """
+        return self.llm.invoke(messages, config={"callbacks": callbacks})
+
+    @backoff.on_exception(
+        backoff.expo,
+        _RETRYABLE_ERRORS,
+        max_tries=7,
+        max_time=45,
+        jitter=backoff.full_jitter,
+        giveup=_giveup,
+        on_backoff=_asleep_retry_after,
+    )
+    async def abackoff_inference(self, messages, callbacks=None):
+        """
+        Version asynchrone de `backoff_inference`, basée sur `ainvoke`.
+
+        Args:
+            messages: Une liste de messages de chat qui seront passés au modèle de langage
+            callbacks: Gestionnaires de callbacks propres à cet appel
+
+        Returns:
+            La sortie du modèle de langage après traitement des messages fournis
+        """
+        return await self.llm.ainvoke(messages, config={"callbacks": callbacks})
+
+    def _complete_batch(self, conversations: List[List[Message]]) -> List[AIMessage]:
+        """
+        Soumet des conversations à l'API Batch et attend leurs réponses.
+
+        Args:
+            conversations: La liste des historiques de messages à compléter
+
+        Returns:
+            Les réponses, dans l'ordre des conversations
+        """
+        return self.wait_for_batch(self.submit_batch(conversations))
+
+    def submit_batch(self, conversations: List[List[Message]]) -> str:
+        """
+        Soumet plusieurs conversations à l'API Batch d'OpenAI.
+
+        Chaque conversation devient une ligne JSONL d'un fichier uploadé avec 
+        `purpose="batch"`, traité par OpenAI dans une fenêtre de 24h.
+
+        Args:
+            conversations: La liste des historiques de messages à compléter
+
+        Returns:
+            L'identifiant du batch créé
+
+        Raises:
+            ValueError: Si un message n'a pas d'équivalent dans l'API (fonction, outil...)
+        """
+        lines = []
+        for i, messages in enumerate(conversations):
+            body = {
+                "model": self.model_name,
+                "temperature": self.temperature,
+                "messages": [
+                    {"role": _openai_role(m), "content": m.content} for m in messages
+                ],
+            }
+            if self.vision:
+                body["max_tokens"] = 4096
+            lines.append(
+                _json_dumps(
+                    {
+                        "custom_id": str(i),
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": body,
+                    }
+                )
+            )
+
+        batch_file = openai.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+        )
+        batch = openai.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.debug(f"Batch {batch.id} soumis avec {len(lines)} requêtes")
+        return batch.id
+
+    def wait_for_batch(
+        self,
+        batch_id: str,
+        poll: float = BATCH_POLL_INTERVAL,
+        timeout: Optional[float] = None,
+    ) -> List[AIMessage]:
         """
-        return self.llm.invoke(messages)
+        Attend la fin d'un batch OpenAI et récupère ses réponses.
+
+        Args:
+            batch_id: L'identifiant du batch retourné par `submit_batch`
+            poll: L'intervalle en secondes entre deux vérifications du statut
+            timeout: Durée maximale d'attente en secondes, illimitée par défaut
+
+        Returns:
+            Les réponses, dans l'ordre des conversations soumises
+
+        Raises:
+            RuntimeError: Si le batch échoue, expire, est annulé, ou si une requête échoue
+            TimeoutError: Si le batch n'est pas terminé avant `timeout` ; il n'est
+                pas annulé et peut encore être récupéré avec son identifiant
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        batch = openai.batches.retrieve(batch_id)
+        while batch.status != "completed":
+            if batch.status in _BATCH_FAILED_STATUSES:
+                raise RuntimeError(
+                    f"Le batch {batch_id} s'est terminé avec le statut '{batch.status}'"
+                )
+            if deadline is not None and time.monotonic() + poll > deadline:
+                raise TimeoutError(
+                    f"Le batch {batch_id} n'est pas terminé après {timeout}s "
+                    f"(statut '{batch.status}')"
+                )
+            time.sleep(poll)
+            batch = openai.batches.retrieve(batch_id)
+
+        responses = {}
+        if batch.output_file_id:
+            output = openai.files.content(batch.output_file_id).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                result = _json_loads(line)
+                response = result.get("response") or {}
+                if response.get("status_code") != 200:
+                    raise RuntimeError(
+                        f"La requête {result['custom_id']} du batch {batch_id} a échoué : "
+                        f"{result.get('error') or response.get('body')}"
+                    )
+                content = response["body"]["choices"][0]["message"]["content"]
+                responses[int(result["custom_id"])] = AIMessage(content=content)
+
+        if len(responses) != batch.request_counts.total:
+            raise RuntimeError(
+                f"Le batch {batch_id} a retourné {len(responses)} réponses sur "
+                f"{batch.request_counts.total}"
+            )
+        return [responses[i] for i in sorted(responses)]
 
     @staticmethod
     def serialize_messages(messages: List[Message]) -> str:
@@ -220,7 +733,7 @@ class AI:
         Returns:
             Les messages sérialisés comme chaîne JSON
         """
-        return json.dumps(messages_to_dict(messages))
+        return _json_dumps(messages_to_dict(messages))
 
     @staticmethod
     def deserialize_messages(jsondictstr: str) -> List[Message]:
@@ -233,56 +746,30 @@ class AI:
         Returns:
             La liste désérialisée de messages
         """
-        data = json.loads(jsondictstr)
+        data = _json_loads(jsondictstr)
         # Modifie la propriété implicite is_chunk à TOUJOURS faux
         # car le schéma Message de Langchain est plus strict
-        prevalidated_data = [
-            {**item, "tools": {**item.get("tools", {}), "is_chunk": False}}
-            for item in data
-        ]
-        return list(messages_from_dict(prevalidated_data))
+        for item in data:
+            item.setdefault("tools", {})["is_chunk"] = False
+        return list(messages_from_dict(data))
 
     def _create_chat_model(self) -> BaseChatModel:
         """
         Crée un modèle de chat avec le nom de modèle et la température spécifiés.
 
+        Les modèles sont partagés entre les instances d'AI de même configuration, 
+        ce qui réutilise aussi leurs clients HTTP et connexions keep-alive.
+
         Returns:
             Le modèle de chat créé
         """
-        if self.azure_endpoint:
-            return AzureChatOpenAI(
-                azure_endpoint=self.azure_endpoint,
-                openai_api_version=os.getenv(
-                    "OPENAI_API_VERSION", "2024-05-01-preview"
-                ),
-                deployment_name=self.model_name,
-                openai_api_type="azure",
-                streaming=self.streaming,
-                callbacks=[StreamingStdOutCallbackHandler()],
-            )
-        elif "claude" in self.model_name:
-            return ChatAnthropic(
-                model=self.model_name,
-                temperature=self.temperature,
-                callbacks=[StreamingStdOutCallbackHandler()],
-                streaming=self.streaming,
-                max_tokens_to_sample=4096,
-            )
-        elif self.vision:
-            return ChatOpenAI(
-                model=self.model_name,
-                temperature=self.temperature,
-                streaming=self.streaming,
-                callbacks=[StreamingStdOutCallbackHandler()],
-                max_tokens=4096,  # les modèles de vision ont par défaut des limites de tokens faibles
-            )
-        else:
-            return ChatOpenAI(
-                model=self.model_name,
-                temperature=self.temperature,
-                streaming=self.streaming,
-                callbacks=[StreamingStdOutCallbackHandler()],
-            )
+        return _build_llm(
+            self.model_name,
+            self.temperature,
+            self.azure_endpoint,
+            self.streaming,
+            self.vision,
+        )
 
 
 def serialize_messages(messages: List[Message]) -> str:
@@ -321,6 +808,7 @@ class ClipboardAI(AI):
         prompt: Optional[str] = None,
         *,
         step_name: str,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
     ) -> List[Message]:
         """
         Pas encore complètement supporté.
@@ -330,9 +818,11 @@ class ClipboardAI(AI):
 
         logger.debug(f"Création d'une nouvelle complétion de chat : {messages}")
 
+        import pyperclip
+
         msgs = self.serialize_messages(messages)
         pyperclip.copy(msgs)
-        Path("clipboard.txt").write_text(msgs)
+        Path("clipboard.txt").write_text(msgs, encoding="utf-8")
         print(
             "Messages copiés dans le presse-papiers et écrits dans clipboard.txt,",
             len(msgs),
@@ -7,14 +7,144 @@ les chaînes de format diff git unifié.
 """
 
 import logging
-import re
-from typing import Dict
+from typing import Any, Callable, Dict, List, Tuple
+
+from langchain.callbacks.base import BaseCallbackHandler
 
 from gpt_genius.core.files_dict import FilesDict
 
 # Initialiser un logger pour ce module
 logger = logging.getLogger(__name__)
 
+# Délimiteur des blocs de code Markdown
+FENCE = "```"
+
+# Table de suppression des caractères interdits dans les chemins de fichiers
+_PATH_INVALID_CHARS = str.maketrans("", "", ':<>"|?*')
+
+
+def _clean_path(raw_path: str) -> str:
+    """
+    Nettoie et standardise un chemin de fichier extrait du chat.
+
+    Args:
+        raw_path: Le chemin brut tel qu'il apparaît dans le chat
+
+    Returns:
+        Le chemin sans caractères interdits ni délimiteurs Markdown
+    """
+    path = raw_path.translate(_PATH_INVALID_CHARS)
+    if len(path) > 1 and path[0] == "[" and path[-1] == "]":
+        path = path[1:-1]
+    if len(path) > 1 and path[0] == "`" and path[-1] == "`":
+        path = path[1:-1]
+    if path.endswith("]"):
+        path = path[:-1]
+    return path.strip()
+
+
+class ChatFilesScanner:
+    """
+    Analyseur incrémental qui extrait les fichiers d'un chat au fil de l'eau.
+
+    Un fichier est un bloc de code dont la dernière ligne non vide précédant 
+    l'ouverture se termine par son chemin. Les blocs sans chemin sont ignorés. 
+    Le texte peut être fourni par morceaux arbitraires (par exemple les tokens 
+    d'une réponse en streaming) : chaque fichier est produit dès que son bloc 
+    de code se ferme.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._path = None
+        # None hors d'un bloc de fichier, sinon les lignes du bloc en cours
+        self._chunks = None
+        self._in_anonymous_block = False
+
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Ajoute un morceau de texte au chat analysé.
+
+        Args:
+            text: Le morceau de texte à analyser
+
+        Returns:
+            Les couples (chemin nettoyé, contenu) des fichiers complétés par ce morceau
+        """
+        lines = (self._pending + text).splitlines(keepends=True)
+        if lines and not lines[-1].endswith(("\n", "\r")):
+            self._pending = lines.pop()
+        else:
+            self._pending = ""
+        return self._scan(lines)
+
+    def close(self) -> List[Tuple[str, str]]:
+        """
+        Termine l'analyse en traitant la dernière ligne incomplète éventuelle.
+
+        Returns:
+            Les couples (chemin nettoyé, contenu) des fichiers complétés par cette ligne
+        """
+        pending, self._pending = self._pending, ""
+        return self._scan([pending] if pending else [])
+
+    def _scan(self, lines: List[str]) -> List[Tuple[str, str]]:
+        files = []
+        for line in lines:
+            stripped = line.strip()
+            if self._chunks is not None:
+                if stripped.startswith(FENCE):
+                    files.append(
+                        (_clean_path(self._path), "".join(self._chunks).strip())
+                    )
+                    self._chunks = None
+                    self._path = None
+                else:
+                    self._chunks.append(line)
+            elif self._in_anonymous_block:
+                if stripped.startswith(FENCE):
+                    self._in_anonymous_block = False
+            elif stripped.startswith(FENCE):
+                if self._path:
+                    self._chunks = []
+                else:
+                    self._in_anonymous_block = True
+            elif stripped:
+                self._path = stripped.split()[-1]
+        return files
+
+
+class ChatToFilesCallbackHandler(BaseCallbackHandler):
+    """
+    Handler LangChain qui transmet chaque fichier dès que son bloc de code se ferme 
+    dans la réponse en streaming, sans attendre la fin de la génération.
+    """
+
+    def __init__(self, on_file: Callable[[str, str], Any]):
+        """
+        Initialise le handler.
+
+        Args:
+            on_file: Fonction appelée avec (chemin, contenu) pour chaque fichier complété
+        """
+        self.on_file = on_file
+        self._scanner = ChatFilesScanner()
+
+    def on_llm_start(self, serialized, prompts, **kwargs: Any) -> None:
+        # Une nouvelle tentative (backoff) recommence la réponse depuis le début
+        self._scanner = ChatFilesScanner()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        self._scanner = ChatFilesScanner()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        for path, content in self._scanner.feed(token):
+            self.on_file(path, content)
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        for path, content in self._scanner.close():
+            self.on_file(path, content)
+
 
 def chat_to_files_dict(chat: str) -> FilesDict:
     """
@@ -27,25 +157,10 @@ def chat_to_files_dict(chat: str) -> FilesDict:
     Returns:
         Un dictionnaire avec les chemins de fichiers comme clés et les blocs de code comme valeurs
     """
-    # Regex pour matcher les chemins de fichiers et blocs de code associés
-    regex = r"(\S+)\n\s*```[^\n]*\n(.+?)```"
-    matches = re.finditer(regex, chat, re.DOTALL)
-
-    files_dict = FilesDict()
-    for match in matches:
-        # Nettoyer et standardiser le chemin de fichier
-        path = re.sub(r'[\:<>"|?*]', "", match.group(1))
-        path = re.sub(r"^\[(.*)\]$", r"\1", path)
-        path = re.sub(r"^`(.*)`$", r"\1", path)
-        path = re.sub(r"[\]\:]$", "", path)
-
-        # Extraire et nettoyer le contenu du code
-        content = match.group(2)
-
-        # Ajouter le chemin nettoyé et le contenu au FilesDict
-        files_dict[path.strip()] = content.strip()
-
-    return files_dict
+    scanner = ChatFilesScanner()
+    # Les chemins sont déjà nettoyés : les couples sont passés tels quels au
+    # constructeur, sans dictionnaire intermédiaire
+    return FilesDict(scanner.feed(chat) + scanner.close())
 
 
 def apply_diffs(diffs: Dict[str, any], files: FilesDict) -> FilesDict:
@@ -59,10 +174,13 @@ def apply_diffs(diffs: Dict[str, any], files: FilesDict) -> FilesDict:
     Returns:
         Les fichiers mis à jour après application des diffs
     """
-    # Pour cette version simplifiée, on retourne juste les fichiers originaux
+    if not diffs:
+        return files
+
+    # Pour cette version simplifiée, on retourne juste une copie des fichiers originaux
     # Dans une version complète, on implémenterait l'application réelle des diffs
     logger.info("Application des diffs (fonctionnalité simplifiée)")
-    return FilesDict(files.copy())
+    return files.copy()
 
 
 def parse_diffs(diff_string: str, diff_timeout=3) -> dict:
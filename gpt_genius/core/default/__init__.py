@@ -2,14 +2,21 @@
 Modules d'implémentation par défaut pour GPT Genius.
 """
 
-from gpt_genius.core.default.disk_memory import DiskMemory
-from gpt_genius.core.default.disk_execution_env import DiskExecutionEnv
-from gpt_genius.core.default.file_store import FileStore
-from gpt_genius.core.default.simple_agent import SimpleAgent
+from gpt_genius._lazy import lazy_exports
+
+# Exports chargés à la demande (PEP 562) : SimpleAgent importe LangChain
+_LAZY_IMPORTS = {
+    "DiskMemory": "gpt_genius.core.default.disk_memory",
+    "DiskExecutionEnv": "gpt_genius.core.default.disk_execution_env",
+    "FileStore": "gpt_genius.core.default.file_store",
+    "SimpleAgent": "gpt_genius.core.default.simple_agent",
+}
 
 __all__ = [
     "DiskMemory",
     "DiskExecutionEnv", 
     "FileStore",
     "SimpleAgent",
-]
\ No newline at end of file
+]
+
+__getattr__, __dir__ = lazy_exports(globals(), _LAZY_IMPORTS)
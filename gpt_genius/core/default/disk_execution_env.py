@@ -6,15 +6,24 @@ de fichiers local. Il inclut des méthodes pour uploader des fichiers vers
 l'environnement d'exécution, exécuter des commandes, et capturer la sortie.
 """
 
+import codecs
+import os
+import selectors
 import subprocess
+import sys
 import time
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import Callable, Iterator, Optional, Tuple, Union
 
 from gpt_genius.core.base_execution_env import BaseExecutionEnv
 from gpt_genius.core.default.file_store import FileStore
 from gpt_genius.core.files_dict import FilesDict
 
+# Taille maximale lue en un appel sur stdout ou stderr
+READ_CHUNK_SIZE = 65536
+# Attente maximale (en secondes) entre deux vérifications de la fin du processus
+EXIT_POLL_INTERVAL = 0.05
+
 
 class DiskExecutionEnv(BaseExecutionEnv):
     """
@@ -71,47 +80,42 @@ class DiskExecutionEnv(BaseExecutionEnv):
         )
         return p
 
-    def run(self, command: str, timeout: Optional[int] = None) -> Tuple[str, str, int]:
+    def run(
+        self, command: str, timeout: Optional[int] = None, verbose: bool = True
+    ) -> Tuple[str, str, int]:
         """
         Exécute une commande dans l'environnement d'exécution.
 
         Args:
             command: La commande à exécuter
             timeout: Timeout optionnel en secondes
+            verbose: Si False, la sortie est seulement capturée, sans être affichée
 
         Returns:
             Tuple (stdout, stderr, return_code)
         """
-        start = time.time()
-        print("\n--- Début de l'exécution ---")
+        if verbose:
+            print("\n--- Début de l'exécution ---")
         # pendant l'exécution, imprime aussi stdout et stderr
         p = subprocess.Popen(
             command,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             cwd=self.files.working_dir,
-            text=True,
             shell=True,
         )
-        print("$", command)
-        stdout_full, stderr_full = "", ""
+        if verbose:
+            print("$", command)
+        # Octets bruts accumulés puis décodés une seule fois : pas de
+        # concaténation de chaînes quadratique sur les sorties volumineuses
+        outputs = {True: bytearray(), False: bytearray()}
+        echo = self._make_echo() if verbose else None
 
         try:
-            while p.poll() is None:
-                assert p.stdout is not None
-                assert p.stderr is not None
-                stdout = p.stdout.readline()
-                stderr = p.stderr.readline()
-                if stdout:
-                    print(stdout, end="")
-                    stdout_full += stdout
-                if stderr:
-                    print(stderr, end="")
-                    stderr_full += stderr
-                if timeout and time.time() - start > timeout:
-                    print("Timeout!")
-                    p.kill()
-                    raise TimeoutError()
+            for is_stdout, data in self._iter_output(p, timeout):
+                outputs[is_stdout] += data
+                if echo is not None:
+                    echo(is_stdout, data)
         except KeyboardInterrupt:
             print()
             print("Arrêt de l'exécution.")
@@ -120,4 +124,142 @@ class DiskExecutionEnv(BaseExecutionEnv):
             print()
             print("--- Fin d'exécution ---\n")
 
-        return stdout_full, stderr_full, p.returncode
\ No newline at end of file
+        return (
+            outputs[True].decode("utf-8", "replace"),
+            outputs[False].decode("utf-8", "replace"),
+            p.returncode,
+        )
+
+    @staticmethod
+    def _make_echo() -> Callable[[bool, bytes], None]:
+        """
+        Crée la fonction qui affiche les blocs de sortie du processus.
+
+        Quand le terminal est en UTF-8, chaque bloc lu est recopié tel quel sur la
+        sortie binaire, en une écriture, sans décodage ni impression ligne par ligne.
+        Sinon, les blocs sont décodés au fil de l'eau puis imprimés.
+
+        Returns:
+            Une fonction prenant (provient_de_stdout, octets lus)
+        """
+        buffer = getattr(sys.stdout, "buffer", None)
+        encoding = (getattr(sys.stdout, "encoding", None) or "").lower()
+        if buffer is not None and encoding.replace("-", "") == "utf8":
+            # Vide la couche texte pour conserver l'ordre avec les print précédents
+            sys.stdout.flush()
+
+            def echo(is_stdout: bool, data: bytes) -> None:
+                if data:
+                    buffer.write(data)
+                    buffer.flush()
+
+            return echo
+
+        decoders = {
+            True: codecs.getincrementaldecoder("utf-8")("replace"),
+            False: codecs.getincrementaldecoder("utf-8")("replace"),
+        }
+
+        def echo(is_stdout: bool, data: bytes) -> None:
+            text = decoders[is_stdout].decode(data, final=not data)
+            if text:
+                print(text, end="")
+
+        return echo
+
+    @staticmethod
+    def _iter_output(
+        p: subprocess.Popen, timeout: Optional[int]
+    ) -> Iterator[Tuple[bool, bytes]]:
+        """
+        Lit stdout et stderr du processus au fur et à mesure qu'ils produisent des données.
+
+        Les deux flux sont surveillés ensemble par un sélecteur (epoll sous Linux),
+        de sorte qu'aucun ne bloque la lecture de l'autre. Chaque flux se termine
+        par un bloc vide. La lecture s'arrête dès que le processus est terminé et
+        que ses pipes sont vidés, même si un processus lancé en arrière-plan
+        (`(sleep 3 &); echo fini`) les garde ouverts : sa sortie ultérieure n'est
+        pas capturée. Sous Windows, où les pipes ne sont pas sélectionnables, la
+        sortie est lue en une fois à la fin du processus.
+
+        Args:
+            p: Le processus dont la sortie est lue
+            timeout: Timeout optionnel en secondes
+
+        Yields:
+            Des couples (provient_de_stdout, octets lus)
+
+        Raises:
+            TimeoutError: Si le processus dépasse le timeout ; il est alors tué
+        """
+        assert p.stdout is not None
+        assert p.stderr is not None
+        deadline = time.monotonic() + timeout if timeout else None
+
+        if sys.platform == "win32":
+            try:
+                stdout, stderr = p.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                print("Timeout!")
+                p.kill()
+                raise TimeoutError()
+            yield from ((True, stdout), (True, b""), (False, stderr), (False, b""))
+            return
+
+        stdout_fd = p.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            for stream in (p.stdout, p.stderr):
+                os.set_blocking(stream.fileno(), False)
+                selector.register(stream.fileno(), selectors.EVENT_READ)
+
+            while selector.get_map():
+                if p.poll() is not None:
+                    # Le processus est terminé : ce qui reste dans les pipes est lu
+                    # sans attendre leur fermeture par d'éventuels descendants
+                    for fd in list(selector.get_map()):
+                        yield from DiskExecutionEnv._drain(fd, fd == stdout_fd)
+                    break
+                wait = EXIT_POLL_INTERVAL
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                events = selector.select(wait) if wait > 0 else []
+                if not events and deadline is not None and time.monotonic() >= deadline:
+                    print("Timeout!")
+                    p.kill()
+                    raise TimeoutError()
+                for key, _ in events:
+                    data = os.read(key.fd, READ_CHUNK_SIZE)
+                    if not data:
+                        selector.unregister(key.fd)
+                    yield key.fd == stdout_fd, data
+
+        wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            p.wait(timeout=wait)
+        except subprocess.TimeoutExpired:
+            print("Timeout!")
+            p.kill()
+            raise TimeoutError()
+
+    @staticmethod
+    def _drain(fd: int, is_stdout: bool) -> Iterator[Tuple[bool, bytes]]:
+        """
+        Lit les données déjà disponibles sur un pipe non bloquant, sans attendre
+        sa fermeture.
+
+        Args:
+            fd: Le descripteur du pipe
+            is_stdout: Si le pipe est la sortie standard du processus
+
+        Yields:
+            Des couples (provient_de_stdout, octets lus), terminés par un bloc vide
+        """
+        while True:
+            try:
+                data = os.read(fd, READ_CHUNK_SIZE)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            yield is_stdout, data
+        yield is_stdout, b""
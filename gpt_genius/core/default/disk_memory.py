@@ -8,14 +8,91 @@ de ces fichiers.
 
 import base64
 import json
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterator, Optional, Union
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from gpt_genius.core.base_memory import BaseMemory
+from gpt_genius.core.default.file_utils import read_text, walk
 from gpt_genius.tools.supported_languages import SUPPORTED_LANGUAGES
 
+# pybase64 utilise des instructions SIMD et encode nettement plus vite que base64
+try:
+    import pybase64
+
+    _b64encode = pybase64.b64encode
+    HAS_PYBASE64 = True
+except ImportError:
+    _b64encode = base64.b64encode
+    HAS_PYBASE64 = False
+
+# orjson sérialise nettement plus vite que json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Extensions des fichiers de code supportés
+_VALID_EXTS = frozenset(
+    ext for lang in SUPPORTED_LANGUAGES for ext in lang["extensions"]
+)
+# Ajout en fin de fichier, O_BINARY évitant la traduction des fins de ligne sous Windows
+_LOG_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+# Types MIME des images renvoyées encodées en Base64, par extension
+_IMAGE_MIME_TYPES = {".png": "image/png", ".jpeg": "image/jpeg", ".jpg": "image/jpeg"}
+# Multiple de 3 : chaque bloc s'encode sans remplissage et les sorties se concatènent
+_B64_CHUNK_SIZE = 3 * 8192
+# Taille du tampon d'écriture des fichiers de update()
+_WRITE_BUFFER_SIZE = 65536
+
+
+def _b64encode_file(path: Path) -> str:
+    """
+    Encode un fichier en Base64 par blocs, sans charger tout le fichier en mémoire.
+
+    Args:
+        path: Le chemin du fichier à encoder
+
+    Returns:
+        Le contenu du fichier encodé en Base64
+    """
+    out = bytearray()
+    buffer = bytearray(_B64_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            out += _b64encode(view[:n])
+    return out.decode("ascii")
+
+
+def _fast_rmtree(path: str) -> None:
+    """
+    Supprime récursivement un répertoire avec `os.scandir`, `os.unlink` et `os.rmdir`.
+
+    Le répertoire mémoire est contrôlé par l'application : les liens symboliques
+    sont supprimés sans être suivis, sans les vérifications de `shutil.rmtree`.
+    En cas d'erreur, la suppression est reprise par `shutil.rmtree`.
+
+    Args:
+        path: Le répertoire à supprimer
+    """
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    _fast_rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+        os.rmdir(path)
+    except OSError:
+        shutil.rmtree(path)
+
 
 class DiskMemory(BaseMemory):
     """
@@ -28,15 +105,20 @@ class DiskMemory(BaseMemory):
     valeurs basées sur les clés, et la définition de nouvelles paires clé-valeur.
     """
 
-    def __init__(self, path: Union[str, Path]):
+    def __init__(self, path: Union[str, Path], log_enabled: bool = True):
         """
         Initialise la classe DiskMemory avec un chemin spécifié.
 
         Args:
             path: Le chemin vers le répertoire où les fichiers de la base de données seront stockés
+            log_enabled: Si False, les entrées passées à `log_lazy` ne sont ni construites ni écrites
         """
-        self.path: Path = Path(path).absolute()
-        self.path.mkdir(parents=True, exist_ok=True)
+        # Chemin absolu résolu une seule fois ; la chaîne sert aux accès fréquents
+        # sans construire d'objet Path par appel
+        self._path_str = os.path.abspath(os.fspath(path))
+        self.path: Path = Path(self._path_str)
+        os.makedirs(self._path_str, exist_ok=True)
+        self.log_enabled = log_enabled
 
     def __contains__(self, key: str) -> bool:
         """
@@ -48,7 +130,7 @@ class DiskMemory(BaseMemory):
         Returns:
             True si le fichier existe, False sinon
         """
-        return (self.path / key).is_file()
+        return os.path.isfile(os.path.join(self._path_str, key))
 
     def __getitem__(self, key: str) -> str:
         """
@@ -65,19 +147,29 @@ class DiskMemory(BaseMemory):
         Raises:
             KeyError: Si le fichier correspondant à la clé n'existe pas dans la base de données
         """
-        full_path = self.path / key
+        full_path = os.path.join(self._path_str, key)
 
-        if not full_path.is_file():
+        if not os.path.isfile(full_path):
             raise KeyError(f"Le fichier '{key}' n'a pu être trouvé dans '{self.path}'")
 
-        if full_path.suffix in [".png", ".jpeg", ".jpg"]:
-            with full_path.open("rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode("utf-8")
-                mime_type = "image/png" if full_path.suffix == ".png" else "image/jpeg"
-                return f"data:{mime_type};base64,{encoded_string}"
-        else:
-            with full_path.open("r", encoding="utf-8") as f:
-                return f.read()
+        return self._read_raw(full_path)
+
+    @staticmethod
+    def _read_raw(full_path: Union[str, Path]) -> str:
+        """
+        Lit un fichier dont l'existence est déjà vérifiée, les images étant
+        encodées en Base64.
+
+        Args:
+            full_path: Le chemin absolu du fichier
+
+        Returns:
+            Le contenu du fichier, ou l'URL de données Base64 pour une image
+        """
+        mime_type = _IMAGE_MIME_TYPES.get(os.path.splitext(full_path)[1])
+        if mime_type is not None:
+            return f"data:{mime_type};base64,{_b64encode_file(full_path)}"
+        return read_text(full_path)
 
     def get(self, key: str, default: Optional[Any] = None) -> Any:
         """
@@ -113,15 +205,44 @@ class DiskMemory(BaseMemory):
             ValueError: Si la clé tente d'accéder à un chemin parent
             TypeError: Si la valeur n'est pas une chaîne
         """
-        if str(key).startswith("../"):
-            raise ValueError(f"Le nom de fichier {key} a tenté d'accéder au chemin parent.")
+        self.update({key: val})
 
-        if not isinstance(val, str):
-            raise TypeError("val doit être str")
+    def update(self, other: Any = (), /, **kwargs: str) -> None:
+        """
+        Écrit plusieurs fichiers dans la base de données en un seul passage.
 
-        full_path = self.path / key
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        full_path.write_text(val, encoding="utf-8")
+        Toutes les paires sont validées avant la première écriture, et chaque
+        répertoire parent n'est créé qu'une fois.
+
+        Args:
+            other: Un mapping ou un itérable de paires (clé, contenu)
+            **kwargs: Des paires supplémentaires clé=contenu
+
+        Raises:
+            ValueError: Si une clé tente d'accéder à un chemin parent
+            TypeError: Si une valeur n'est pas une chaîne
+        """
+        items = list(other.items() if hasattr(other, "items") else other)
+        items.extend(kwargs.items())
+        for key, val in items:
+            if str(key).startswith("../"):
+                raise ValueError(
+                    f"Le nom de fichier {key} a tenté d'accéder au chemin parent."
+                )
+            if not isinstance(val, str):
+                raise TypeError("val doit être str")
+
+        root = self._path_str
+        created = set()
+        for key, val in items:
+            full_path = os.path.join(root, key)
+            parent = os.path.dirname(full_path)
+            if parent not in created:
+                os.makedirs(parent, exist_ok=True)
+                created.add(parent)
+            # Écriture binaire du contenu encodé, sans couche io.TextIOWrapper
+            with open(full_path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+                f.write(val.encode("utf-8"))
 
     def __delitem__(self, key: Union[str, Path]) -> None:
         """
@@ -140,7 +261,7 @@ class DiskMemory(BaseMemory):
         if item_path.is_file():
             item_path.unlink()
         elif item_path.is_dir():
-            shutil.rmtree(item_path)
+            _fast_rmtree(str(item_path))
 
     def __iter__(self) -> Iterator[str]:
         """
@@ -149,13 +270,33 @@ class DiskMemory(BaseMemory):
         Returns:
             Un itérateur sur la liste triée des clés (noms de fichiers) dans la base de données
         """
-        return iter(
-            sorted(
-                str(item.relative_to(self.path))
-                for item in sorted(self.path.rglob("*"))
-                if item.is_file()
-            )
-        )
+        return iter(self._sorted_files())
+
+    def _sorted_files(self) -> List[str]:
+        """
+        Liste les fichiers de la base de données en un seul parcours, triés une fois.
+
+        Returns:
+            La liste triée des chemins relatifs des fichiers
+        """
+        root = self._path_str
+        prefix_len = len(root) + 1
+        files = [path[prefix_len:] for path, is_file in walk(root) if is_file]
+        files.sort()
+        return files
+
+    def _file_index(self) -> List[Tuple[str, str]]:
+        """
+        Retourne l'index trié des fichiers avec leur extension, construit en un seul
+        parcours. Il n'est pas mis en cache : la date de modification de la racine
+        ne reflète pas les écritures dans les sous-répertoires ni celles faites par
+        d'autres instances.
+
+        Returns:
+            La liste triée des couples (chemin relatif, extension)
+        """
+        splitext = os.path.splitext
+        return [(item, splitext(item)[1]) for item in self._sorted_files()]
 
     def __len__(self) -> int:
         """
@@ -164,24 +305,18 @@ class DiskMemory(BaseMemory):
         Returns:
             Le nombre de fichiers dans la base de données
         """
-        return len(list(self.__iter__()))
+        # Simple comptage sur le parcours, sans construire ni trier la liste des clés
+        return sum(1 for _, is_file in walk(self._path_str) if is_file)
 
     def _supported_files(self) -> str:
         """Retourne les fichiers avec des extensions supportées."""
-        valid_extensions = {
-            ext for lang in SUPPORTED_LANGUAGES for ext in lang["extensions"]
-        }
-        file_paths = [
-            str(item)
-            for item in self
-            if Path(item).is_file() and Path(item).suffix in valid_extensions
-        ]
-        return "\n".join(file_paths)
+        return "\n".join(
+            item for item, suffix in self._file_index() if suffix in _VALID_EXTS
+        )
 
     def _all_files(self) -> str:
         """Retourne tous les fichiers."""
-        file_paths = [str(item) for item in self if Path(item).is_file()]
-        return "\n".join(file_paths)
+        return "\n".join(item for item, _ in self._file_index())
 
     def to_path_list_string(self, supported_code_files_only: bool = False) -> str:
         """
@@ -199,14 +334,27 @@ class DiskMemory(BaseMemory):
         else:
             return self._all_files()
 
-    def to_dict(self) -> Dict[Union[str, Path], str]:
+    def to_dict(self, workers: int = 16) -> Dict[Union[str, Path], str]:
         """
         Convertit le contenu de la base de données en dictionnaire.
 
+        Les fichiers sont lus en parallèle pour recouvrir les latences d'entrée/sortie.
+
+        Args:
+            workers: Le nombre maximal de threads de lecture
+
         Returns:
             Un dictionnaire avec les clés comme noms de fichiers et les valeurs comme contenu de fichiers
         """
-        return {file_path: self[file_path] for file_path in self}
+        keys = self._sorted_files()
+        join, root = os.path.join, self._path_str
+        paths = [join(root, key) for key in keys]
+        if len(paths) <= 1 or workers <= 1:
+            contents = [self._read_raw(path) for path in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+                contents = list(executor.map(self._read_raw, paths))
+        return dict(zip(keys, contents))
 
     def to_json(self) -> str:
         """
@@ -215,8 +363,34 @@ class DiskMemory(BaseMemory):
         Returns:
             Une représentation en chaîne JSON du contenu de la base de données
         """
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2).decode(
+                "utf-8"
+            )
         return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
 
+    def to_json_stream(self, out: IO[str]) -> None:
+        """
+        Écrit le contenu de la base de données en JSON dans un flux, fichier par fichier.
+
+        Contrairement à `to_json`, un seul fichier est en mémoire à la fois. Le
+        résultat est identique à celui de `to_json`.
+
+        Args:
+            out: Le flux texte dans lequel écrire le JSON
+        """
+        join, root = os.path.join, self._path_str
+        separator = "{\n"
+        for key in self._sorted_files():
+            value = self._read_raw(join(root, key))
+            out.write(separator)
+            out.write("  ")
+            out.write(json.dumps(key, ensure_ascii=False))
+            out.write(": ")
+            out.write(json.dumps(value, ensure_ascii=False))
+            separator = ",\n"
+        out.write("{}" if separator == "{\n" else "\n}")
+
     def log(self, key: Union[str, Path], val: str) -> None:
         """
         Ajoute à un fichier ou le crée et écrit dedans s'il n'existe pas.
@@ -234,20 +408,37 @@ class DiskMemory(BaseMemory):
         full_path = self.path / "logs" / key
         full_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Toucher s'il n'existe pas
-        if not full_path.exists():
-            full_path.touch()
+        # Une seule ouverture (qui crée le fichier au besoin) et une seule écriture
+        view = memoryview(f"\n{datetime.now().isoformat()}\n{val}\n".encode("utf-8"))
+        fd = os.open(full_path, _LOG_FLAGS, 0o644)
+        try:
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
 
-        with open(full_path, "a", encoding="utf-8") as file:
-            file.write(f"\n{datetime.now().isoformat()}\n")
-            file.write(val + "\n")
+    def log_lazy(self, key: Union[str, Path], producer: Callable[[], str]) -> None:
+        """
+        Ajoute une entrée de log dont le contenu n'est construit que si les logs
+        sont activés.
+
+        Args:
+            key: La clé (nom de fichier) où le contenu doit être ajouté
+            producer: Fonction sans argument retournant le contenu à ajouter
+        """
+        if self.log_enabled:
+            self.log(key, producer())
 
     def archive_logs(self):
         """
         Déplace tous les logs vers le répertoire d'archive basé sur l'horodatage actuel.
+
+        L'archivage est un simple renommage atomique du répertoire, sans copie des logs.
         """
-        if "logs" in self:
+        logs_dir = self.path / "logs"
+        if logs_dir.is_dir():
             archive_dir = (
-                self.path / f"logs_{datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}"
+                self.path / f"logs_{datetime.now().strftime('%Y-%m-%d-%H-%M-%S-%f')}"
             )
-            shutil.move(self.path / "logs", archive_dir)
\ No newline at end of file
+            os.replace(logs_dir, archive_dir)
\ No newline at end of file
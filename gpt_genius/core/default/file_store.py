@@ -6,13 +6,53 @@ Il inclut des méthodes pour uploader des fichiers vers le répertoire et les t
 comme une collection de fichiers.
 """
 
+import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Union
+from typing import Dict, Optional, Tuple, Union
 
+from gpt_genius.core.default.file_utils import read_text, walk
 from gpt_genius.core.files_dict import FilesDict
 from gpt_genius.core.linting import Linting
 
+# xxh3 hache bien plus vite que le disque n'écrit ; à défaut, le hachage natif suffit
+try:
+    import xxhash
+
+    _content_hash = xxhash.xxh3_64_intdigest
+except ImportError:
+    _content_hash = hash
+
+# Les lectures et écritures sont limitées par les appels système : on les recouvre
+# avec plusieurs threads
+MAX_IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+WRITE_CHUNK_SIZE = 1 << 20
+# Extensions de fichiers binaires connues, marquées sans être lues
+_BINARY_EXTS = frozenset(
+    {
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".bmp",
+        ".ico",
+        ".webp",
+        ".pdf",
+        ".zip",
+        ".gz",
+        ".tar",
+        ".7z",
+        ".so",
+        ".dll",
+        ".exe",
+        ".pyc",
+        ".whl",
+    }
+)
+# O_BINARY n'existe que sous Windows, où il évite la traduction des fins de ligne
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
 
 class FileStore:
     """
@@ -33,6 +73,9 @@ class FileStore:
         self.working_dir = Path(path)
         self.working_dir.mkdir(parents=True, exist_ok=True)
         self.id = self.working_dir.name.split("-")[-1]
+        # Empreinte du contenu, date de modification et taille de chaque fichier écrit
+        self._written: Dict[str, Tuple[int, int, int]] = {}
+        self._linting: Optional[Linting] = None
 
     def push(self, files: FilesDict):
         """
@@ -44,13 +87,75 @@ class FileStore:
         Returns:
             L'instance FileStore
         """
+        # Les fichiers identiques à la dernière écriture ne sont pas réécrits
+        pending = []
         for name, content in files.items():
-            path = self.working_dir / name
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(content)
+            data = content.encode("utf-8")
+            digest = _content_hash(data)
+            if not self._is_unchanged(name, digest):
+                pending.append((name, data, digest))
+
+        # Chaque répertoire parent n'est créé qu'une fois, avant les écritures
+        for parent in {os.path.dirname(name) for name, _, _ in pending}:
+            if parent:
+                os.makedirs(os.path.join(self.working_dir, parent), exist_ok=True)
+
+        if len(pending) <= 1:
+            for item in pending:
+                self._write_one(item)
+            return self
+
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_IO_WORKERS, len(pending))
+        ) as executor:
+            list(executor.map(self._write_one, pending))
         return self
 
+    def _is_unchanged(self, name: str, digest: int) -> bool:
+        """
+        Indique si un fichier a déjà été écrit avec ce contenu et n'a pas été
+        modifié depuis sur le disque.
+
+        Args:
+            name: Le nom du fichier
+            digest: L'empreinte du contenu à écrire
+
+        Returns:
+            True si l'écriture peut être évitée
+        """
+        written = self._written.get(name)
+        if written is None or written[0] != digest:
+            return False
+        try:
+            stat = os.stat(os.path.join(self.working_dir, name))
+        except OSError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size) == written[1:]
+
+    def _write_one(self, item: Tuple[str, bytes, int]):
+        """
+        Écrit un fichier dans le répertoire de travail, dont le répertoire parent
+        existe déjà.
+
+        Args:
+            item: Le triplet (nom du fichier, contenu encodé, empreinte) à écrire
+        """
+        name, data, digest = item
+        path = os.path.join(self.working_dir, name)
+        # Écriture directe sur le descripteur, sans tampon intermédiaire,
+        # par blocs de WRITE_CHUNK_SIZE octets ; os.write peut écrire moins que
+        # demandé, la boucle reprend alors après la partie écrite
+        view = memoryview(data)
+        fd = os.open(path, _WRITE_FLAGS, 0o644)
+        try:
+            while view:
+                written = os.write(fd, view[:WRITE_CHUNK_SIZE])
+                view = view[written:]
+            stat = os.fstat(fd)
+        finally:
+            os.close(fd)
+        self._written[name] = (digest, stat.st_mtime_ns, stat.st_size)
+
     def linting(self, files: FilesDict) -> FilesDict:
         """
         Applique le linting aux fichiers de code.
@@ -61,23 +166,51 @@ class FileStore:
         Returns:
             Les fichiers après linting
         """
-        linting = Linting()
-        return linting.lint_files(files)
+        # Instance conservée : son cache des contenus déjà conformes sert d'un appel à l'autre
+        if self._linting is None:
+            self._linting = Linting()
+        return self._linting.lint_files(files)
 
     def pull(self) -> FilesDict:
         """
         Tire (download) des fichiers depuis le répertoire de travail.
 
+        Les fichiers binaires (extension connue ou contenu non UTF-8) sont omis :
+        aucun contenu de substitution ne peut ainsi être réécrit par `push`.
+
         Returns:
-            FilesDict contenant tous les fichiers du répertoire de travail
+            FilesDict contenant tous les fichiers texte du répertoire de travail
         """
-        files = {}
-        for path in self.working_dir.glob("**/*"):
-            if path.is_file():
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        content = f.read()
-                except UnicodeDecodeError:
-                    content = "fichier binaire"
-                files[str(path.relative_to(self.working_dir))] = content
-        return FilesDict(files)
\ No newline at end of file
+        paths = [path for path, is_file in walk(str(self.working_dir)) if is_file]
+        if len(paths) <= 1:
+            contents = [_read_file(path) for path in paths]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_IO_WORKERS, len(paths))
+            ) as executor:
+                contents = list(executor.map(_read_file, paths))
+
+        prefix_len = len(str(self.working_dir)) + 1
+        return FilesDict(
+            (path[prefix_len:], content)
+            for path, content in zip(paths, contents)
+            if content is not None
+        )
+
+
+def _read_file(path: str) -> Optional[str]:
+    """
+    Lit un fichier texte du répertoire de travail.
+
+    Args:
+        path: Le chemin du fichier à lire
+
+    Returns:
+        Le contenu du fichier, ou None s'il est binaire
+    """
+    if os.path.splitext(path)[1].lower() in _BINARY_EXTS:
+        return None
+    try:
+        return read_text(path)
+    except UnicodeDecodeError:
+        return None
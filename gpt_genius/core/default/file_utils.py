@@ -0,0 +1,83 @@
+"""
+Utilitaires de parcours et de lecture de fichiers partagés par DiskMemory et FileStore.
+"""
+
+import os
+from typing import Iterator, Tuple
+
+# O_BINARY n'existe que sous Windows, où il évite la traduction des fins de ligne
+_READ_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+# Taille des lectures suivant la première, si elle n'a pas tout renvoyé
+_READ_CHUNK_SIZE = 1 << 20
+
+
+def walk(root: str) -> Iterator[Tuple[str, bool]]:
+    """
+    Parcourt récursivement un répertoire avec `os.scandir`.
+
+    Le type de chaque entrée provient directement de la lecture du répertoire,
+    sans appel `stat` supplémentaire par fichier. Comme `Path.rglob`, les liens
+    symboliques vers des répertoires ne sont pas suivis, ce qui évite les boucles.
+
+    Args:
+        root: Le répertoire à parcourir
+
+    Yields:
+        Des couples (chemin, est_un_fichier) pour chaque entrée sous `root`
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    yield entry.path, False
+                else:
+                    yield entry.path, entry.is_file()
+
+
+def read_bytes(path: str) -> bytes:
+    """
+    Lit un fichier directement sur son descripteur, la première lecture étant
+    dimensionnée par `os.fstat`.
+
+    `os.read` peut renvoyer moins que demandé (NFS, FUSE, signal, ou plafond de
+    0x7ffff000 octets par appel sous Linux) : la lecture continue jusqu'à la fin
+    du fichier.
+
+    Args:
+        path: Le chemin du fichier à lire
+
+    Returns:
+        Le contenu brut du fichier
+    """
+    fd = os.open(path, _READ_FLAGS)
+    try:
+        # Un octet de plus que la taille connue : la lecture suivante renvoie
+        # alors b"" sauf si le fichier a grandi entre-temps
+        chunks = [os.read(fd, os.fstat(fd).st_size + 1)]
+        while chunks[-1]:
+            chunks.append(os.read(fd, _READ_CHUNK_SIZE))
+    finally:
+        os.close(fd)
+    return chunks[0] if len(chunks) <= 2 else b"".join(chunks)
+
+
+def read_text(path: str) -> str:
+    """
+    Lit un fichier texte UTF-8, avec la même normalisation des fins de ligne
+    que la lecture en mode texte.
+
+    Args:
+        path: Le chemin du fichier à lire
+
+    Returns:
+        Le contenu du fichier, avec des fins de ligne "\\n"
+
+    Raises:
+        UnicodeDecodeError: Si le fichier n'est pas en UTF-8
+    """
+    content = read_bytes(path).decode("utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
@@ -6,15 +6,21 @@ une base de code en utilisant l'IA. Il gère les interactions avec le modèle IA
 et l'environnement d'exécution pour générer et raffiner le code basé sur les prompts utilisateur.
 """
 
+import os
 import tempfile
-from typing import Optional
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 
 from gpt_genius.core.ai import AI
 from gpt_genius.core.base_agent import BaseAgent
 from gpt_genius.core.base_execution_env import BaseExecutionEnv
 from gpt_genius.core.base_memory import BaseMemory
+from gpt_genius.core.chat_to_files import ChatToFilesCallbackHandler
 from gpt_genius.core.default.disk_execution_env import DiskExecutionEnv
 from gpt_genius.core.default.disk_memory import DiskMemory
+from gpt_genius.core.default.file_store import FileStore
+from gpt_genius.core.default.file_utils import read_bytes
 from gpt_genius.core.default.paths import PREPROMPTS_PATH, memory_path
 from gpt_genius.core.default.steps import gen_code, gen_entrypoint, improve_fn
 from gpt_genius.core.files_dict import FilesDict
@@ -38,6 +44,7 @@ class SimpleAgent(BaseAgent):
         execution_env: BaseExecutionEnv,
         ai: AI = None,
         preprompts_holder: PrepromptsHolder = None,
+        file_store: Optional[FileStore] = None,
     ):
         """
         Initialise le SimpleAgent.
@@ -47,11 +54,14 @@ class SimpleAgent(BaseAgent):
             execution_env: L'environnement d'exécution où le code est exécuté
             ai: Le modèle IA utilisé pour générer et améliorer le code
             preprompts_holder: Le détenteur des messages preprompt qui guident le modèle IA
+            file_store: Stockage optionnel dans lequel les fichiers générés par `init`
+                sont écrits dès que leur bloc de code est complet dans le flux
         """
         self.preprompts_holder = preprompts_holder or PrepromptsHolder(PREPROMPTS_PATH)
         self.memory = memory
         self.execution_env = execution_env
         self.ai = ai or AI()
+        self.file_store = file_store
 
     @classmethod
     def with_default_config(
@@ -85,14 +95,84 @@ class SimpleAgent(BaseAgent):
         Returns:
             FilesDict contenant le code généré
         """
-        files_dict = gen_code(self.ai, prompt, self.memory, self.preprompts_holder)
+        if self.file_store is None:
+            files_dict = gen_code(self.ai, prompt, self.memory, self.preprompts_holder)
+        else:
+            files_dict = self._gen_code_streaming(prompt)
         entrypoint = gen_entrypoint(
             self.ai, prompt, files_dict, self.memory, self.preprompts_holder
         )
-        combined_dict = {**files_dict, **entrypoint}
-        files_dict = FilesDict(combined_dict)
+        # Mise à jour en place : le point d'entrée l'emporte en cas de collision
+        files_dict.update(entrypoint)
         return files_dict
 
+    def _gen_code_streaming(self, prompt: Prompt) -> FilesDict:
+        """
+        Génère le code en écrivant chaque fichier dans `file_store` dès que son bloc
+        de code est fermé, pendant que le modèle continue de générer les suivants.
+
+        Si une tentative échoue en cours de flux et est relancée (backoff), les
+        fichiers qu'elle seule a écrits sont ensuite supprimés, ou restaurés s'ils
+        existaient avant la génération.
+
+        Args:
+            prompt: Le prompt utilisateur pour la génération
+
+        Returns:
+            FilesDict contenant le code généré
+        """
+        # Contenu d'origine de chaque fichier écrit pendant le flux, None s'il
+        # n'existait pas ; seul le worker d'écriture y accède
+        originals: Dict[str, Optional[bytes]] = {}
+
+        def write(path: str, content: str) -> None:
+            if path not in originals:
+                try:
+                    originals[path] = read_bytes(self._project_path(path))
+                except FileNotFoundError:
+                    originals[path] = None
+            self.file_store.push(FilesDict({path: content}))
+
+        # Un seul worker : les écritures restent dans l'ordre du flux et une
+        # réécriture du même fichier ne peut pas doubler la précédente.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            futures = []
+
+            def on_file(path: str, content: str) -> None:
+                futures.append(executor.submit(write, path, content))
+
+            files_dict = gen_code(
+                self.ai,
+                prompt,
+                self.memory,
+                self.preprompts_holder,
+                callbacks=[ChatToFilesCallbackHandler(on_file)],
+            )
+            for future in futures:
+                future.result()
+
+        for path, original in originals.items():
+            if path in files_dict:
+                continue
+            if original is None:
+                os.remove(self._project_path(path))
+            else:
+                with open(self._project_path(path), "wb") as f:
+                    f.write(original)
+        return files_dict
+
+    def _project_path(self, path: str) -> str:
+        """
+        Retourne le chemin d'un fichier du projet dans le répertoire de `file_store`.
+
+        Args:
+            path: Le chemin relatif du fichier
+
+        Returns:
+            Le chemin complet du fichier
+        """
+        return os.path.join(self.file_store.working_dir, path)
+
     def improve(
         self,
         files_dict: FilesDict,
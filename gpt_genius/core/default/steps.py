@@ -8,9 +8,11 @@ et le raffinement des éditions de code.
 """
 
 import inspect
+import re
 from pathlib import Path
-from typing import MutableMapping, Union
+from typing import Callable, List, MutableMapping, Optional, Union
 
+from langchain.callbacks.base import BaseCallbackHandler
 from langchain.schema import HumanMessage, SystemMessage
 
 from gpt_genius.core.ai import AI
@@ -26,6 +28,11 @@ from gpt_genius.core.files_dict import FilesDict
 from gpt_genius.core.preprompts_holder import PrepromptsHolder
 from gpt_genius.core.prompt import Prompt
 
+# Blocs de code de la réponse du point d'entrée, compilé une seule fois
+_ENTRYPOINT_RE = re.compile(r"```\S*\n(.+?)```", re.DOTALL)
+# Gabarit des prompts système, assemblé en une seule allocation
+_SYS_TEMPLATE = "{roadmap}{instructions}\nUtile à savoir:\n{philosophy}"
+
 
 def curr_fn() -> str:
     """
@@ -37,6 +44,25 @@ def curr_fn() -> str:
     return inspect.stack()[1].function
 
 
+def _log_lazy(memory: BaseMemory, key: str, producer: Callable[[], str]) -> None:
+    """
+    Journalise une entrée dont le contenu n'est construit que si nécessaire.
+
+    Les mémoires qui ne proposent pas `log_lazy` (seul `log` est requis) reçoivent
+    le contenu déjà construit.
+
+    Args:
+        memory: La mémoire où journaliser
+        key: Le fichier de log
+        producer: La fonction qui construit le contenu de l'entrée
+    """
+    log_lazy = getattr(memory, "log_lazy", None)
+    if log_lazy is not None:
+        log_lazy(key, producer)
+    else:
+        memory.log(key, producer())
+
+
 def setup_sys_prompt(preprompts: MutableMapping[Union[str, Path], str]) -> str:
     """
     Configure le prompt système pour générer du code.
@@ -47,11 +73,14 @@ def setup_sys_prompt(preprompts: MutableMapping[Union[str, Path], str]) -> str:
     Returns:
         Le message de prompt système pour le modèle IA
     """
-    return (
-        preprompts["roadmap"]
-        + preprompts["generate"].replace("FILE_FORMAT", preprompts["file_format"])
-        + "\nUtile à savoir:\n"
-        + preprompts["philosophy"]
+    return _SYS_TEMPLATE.format_map(
+        {
+            "roadmap": preprompts["roadmap"],
+            "instructions": preprompts["generate"].replace(
+                "FILE_FORMAT", preprompts["file_format"]
+            ),
+            "philosophy": preprompts["philosophy"],
+        }
     )
 
 
@@ -67,16 +96,23 @@ def setup_sys_prompt_existing_code(
     Returns:
         Le message de prompt système pour le modèle IA pour améliorer du code existant
     """
-    return (
-        preprompts["roadmap"]
-        + preprompts["improve"].replace("FILE_FORMAT", preprompts["file_format_diff"])
-        + "\nUtile à savoir:\n"
-        + preprompts["philosophy"]
+    return _SYS_TEMPLATE.format_map(
+        {
+            "roadmap": preprompts["roadmap"],
+            "instructions": preprompts["improve"].replace(
+                "FILE_FORMAT", preprompts["file_format_diff"]
+            ),
+            "philosophy": preprompts["philosophy"],
+        }
     )
 
 
 def gen_code(
-    ai: AI, prompt: Prompt, memory: BaseMemory, preprompts_holder: PrepromptsHolder
+    ai: AI,
+    prompt: Prompt,
+    memory: BaseMemory,
+    preprompts_holder: PrepromptsHolder,
+    callbacks: Optional[List[BaseCallbackHandler]] = None,
 ) -> FilesDict:
     """
     Génère du code à partir d'un prompt utilisant l'IA et retourne les fichiers générés.
@@ -86,16 +122,23 @@ def gen_code(
         prompt: Le prompt utilisateur pour générer du code
         memory: L'interface mémoire où le code et données associées sont stockés
         preprompts_holder: Le détenteur des messages preprompt qui guident le modèle IA
+        callbacks: Gestionnaires de callbacks recevant la réponse en streaming, par
+            exemple un `ChatToFilesCallbackHandler` écrivant les fichiers au fil de l'eau
 
     Returns:
         Un dictionnaire des noms de fichiers vers leur contenu de code source respectif
     """
     preprompts = preprompts_holder.get_preprompts()
     messages = ai.start(
-        setup_sys_prompt(preprompts), prompt.to_langchain_content(), step_name=curr_fn()
+        setup_sys_prompt(preprompts),
+        prompt.to_langchain_content(),
+        step_name=curr_fn(),
+        callbacks=callbacks,
     )
     chat = messages[-1].content.strip()
-    memory.log(CODE_GEN_LOG_FILE, "\n\n".join(x.pretty_repr() for x in messages))
+    _log_lazy(
+        memory, CODE_GEN_LOG_FILE, lambda: "\n\n".join(x.pretty_repr() for x in messages)
+    )
     files_dict = chat_to_files_dict(chat)
     return files_dict
 
@@ -139,13 +182,16 @@ def gen_entrypoint(
     chat = messages[-1].content.strip()
     
     # Extraction du code depuis les blocs ```
-    import re
-    regex = r"```\S*\n(.+?)```"
-    matches = re.finditer(regex, chat, re.DOTALL)
     entrypoint_code = FilesDict(
-        {ENTRYPOINT_FILE: "\n".join(match.group(1) for match in matches)}
+        {
+            ENTRYPOINT_FILE: "\n".join(
+                match.group(1) for match in _ENTRYPOINT_RE.finditer(chat)
+            )
+        }
+    )
+    _log_lazy(
+        memory, ENTRYPOINT_LOG_FILE, lambda: "\n\n".join(x.pretty_repr() for x in messages)
     )
-    memory.log(ENTRYPOINT_LOG_FILE, "\n\n".join(x.pretty_repr() for x in messages))
     return entrypoint_code
 
 
@@ -182,7 +228,9 @@ def improve_fn(
     
     messages = ai.next(messages, step_name=curr_fn())
     chat = messages[-1].content.strip()
-    memory.log(IMPROVE_LOG_FILE, "\n\n".join(x.pretty_repr() for x in messages))
+    _log_lazy(
+        memory, IMPROVE_LOG_FILE, lambda: "\n\n".join(x.pretty_repr() for x in messages)
+    )
     
     # Pour une version simple, on retourne juste les fichiers originaux
     # Dans une version complète, on appliquerait les diffs ici
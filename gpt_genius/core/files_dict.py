@@ -2,10 +2,13 @@
 Module FilesDict pour la gestion des fichiers de code dans GPT Genius.
 """
 
-from collections import OrderedDict
+import os
 from pathlib import Path
 from typing import Union
 
+# Types de clés acceptés, convertis en chaîne par os.fspath
+_KEY_TYPES = (str, os.PathLike)
+
 
 class FilesDict(dict):
     """
@@ -30,11 +33,30 @@ class FilesDict(dict):
         Raises:
             TypeError: Si la clé n'est pas une chaîne ou un Path, ou si la valeur n'est pas une chaîne
         """
-        if not isinstance(key, (str, Path)):
-            raise TypeError("Les clés doivent être des chaînes ou des Path's")
+        # Cas courant : clé déjà de type str exact, un seul test `is`
+        if type(key) is not str:
+            if not isinstance(key, _KEY_TYPES):
+                raise TypeError("Les clés doivent être des chaînes ou des Path's")
+            # fsdecode décode les chemins dont __fspath__ renvoie des octets
+            key = str(os.fsdecode(key))
         if not isinstance(value, str):
             raise TypeError("Les valeurs doivent être des chaînes")
-        super().__setitem__(str(key), value)
+        dict.__setitem__(self, key, value)
+
+    def copy(self) -> "FilesDict":
+        """
+        Retourne une copie superficielle qui reste un FilesDict.
+
+        Returns:
+            Un nouveau FilesDict contenant les mêmes fichiers
+        """
+        return self.__copy__()
+
+    def __copy__(self) -> "FilesDict":
+        # Les clés et valeurs sont déjà validées : on évite __init__ et __setitem__
+        files = FilesDict.__new__(FilesDict)
+        dict.update(files, self)
+        return files
 
     def to_chat(self):
         """
@@ -44,14 +66,29 @@ class FilesDict(dict):
         Returns:
             Une représentation en chaîne des fichiers
         """
-        chat_str = ""
+        # Fragments assemblés en une seule fois : pas de concaténations répétées
+        parts = ["```\n"]
         for file_name, file_content in self.items():
-            lines_dict = file_to_lines_dict(file_content)
-            chat_str += f"File: {file_name}\n"
-            for line_number, line_content in lines_dict.items():
-                chat_str += f"{line_number} {line_content}\n"
-            chat_str += "\n"
-        return f"```\n{chat_str}```"
+            parts.append(f"File: {file_name}\n")
+            parts.extend(
+                f"{line_number} {line_content}\n"
+                for line_number, line_content in file_to_lines_dict(file_content).items()
+            )
+            parts.append("\n")
+        parts.append("```")
+        return "".join(parts)
+
+    def to_chat_bytes(self) -> bytes:
+        """
+        Formate les fichiers comme `to_chat`, encodés en UTF-8, pour une écriture
+        directe sur un fichier ou un socket.
+
+        Returns:
+            La représentation des fichiers pour le chat, en octets
+        """
+        # str.join dimensionne déjà le résultat en une passe : un seul encodage
+        # suffit, sans tampon intermédiaire
+        return self.to_chat().encode("utf-8")
 
     def to_log(self):
         """
@@ -61,12 +98,12 @@ class FilesDict(dict):
         Returns:
             Une représentation en chaîne des fichiers
         """
-        log_str = ""
+        parts = []
         for file_name, file_content in self.items():
-            log_str += f"File: {file_name}\n"
-            log_str += file_content
-            log_str += "\n"
-        return log_str
+            parts.append(f"File: {file_name}\n")
+            parts.append(file_content)
+            parts.append("\n")
+        return "".join(parts)
 
 
 def file_to_lines_dict(file_content: str) -> dict:
@@ -80,10 +117,10 @@ def file_to_lines_dict(file_content: str) -> dict:
     Returns:
         Un dictionnaire avec les numéros de ligne comme clés et les contenus de ligne comme valeurs
     """
-    lines_dict = OrderedDict(
-        {
-            line_number: line_content
-            for line_number, line_content in enumerate(file_content.split("\n"), 1)
-        }
-    )
-    return lines_dict
\ No newline at end of file
+    # Découpage sur "\n" uniquement, comme les diffs : splitlines couperait aussi
+    # sur \r, \f ou \u2028 et décalerait la numérotation des lignes
+    lines = file_content.split("\n")
+    if file_content.endswith("\n"):
+        # Pas de ligne vide parasite après un saut de ligne final
+        lines.pop()
+    return dict(enumerate(lines, 1))
\ No newline at end of file
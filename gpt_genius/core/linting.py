@@ -4,9 +4,19 @@ Module de linting pour GPT Genius.
 Ce module fournit des fonctionnalités de linting pour améliorer la qualité du code généré.
 """
 
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+
 import black
 from gpt_genius.core.files_dict import FilesDict
 
+# Volume total en dessous duquel le démarrage des processus coûte plus que le formatage
+PARALLEL_LINT_MIN_BYTES = 128 * 1024
+
 
 class Linting:
     """
@@ -14,10 +24,14 @@ class Linting:
     """
     
     def __init__(self):
-        # Dictionnaire pour contenir les méthodes de linting pour différents types de fichiers
+        # Dictionnaire pour contenir les méthodes de linting pour différents types de fichiers ;
+        # chacune retourne le couple (contenu linté, succès du linter)
         self.linters = {".py": self.lint_python}
+        # Empreintes des contenus déjà conformes au linter, pour ne pas les reformater
+        self._clean_hashes = set()
 
-    def lint_python(self, content, config):
+    @staticmethod
+    def lint_python(content, config):
         """
         Lint des fichiers Python en utilisant la bibliothèque `black`, gérant toutes les exceptions 
         silencieusement et les loggant. Cette fonction tente de formater le code et retourne le code 
@@ -29,7 +43,8 @@ class Linting:
             config: Configuration pour black
 
         Returns:
-            Le contenu linté ou le contenu original si erreur
+            Le couple (contenu linté ou contenu original si erreur, True si black a
+            réussi à formater le contenu ou n'avait rien à changer)
         """
         try:
             # Essayer de formater le contenu en utilisant black
@@ -41,8 +56,8 @@ class Linting:
         except Exception as error:
             # Si toute autre exception survient, log l'erreur et retourne le contenu original
             print(f"\nErreur: Ne peut pas formater à cause de {error}\n")
-            linted_content = content
-        return linted_content
+            return content, False
+        return linted_content, True
 
     def lint_files(self, files_dict: FilesDict, config: dict = None) -> FilesDict:
         """
@@ -58,18 +73,107 @@ class Linting:
         if config is None:
             config = {}
 
+        config_key = repr(sorted(config.items()))
+        tasks = []
+        splitext = os.path.splitext
         for filename, content in files_dict.items():
-            extension = filename[
-                filename.rfind(".") :
-            ].lower()  # S'assurer de l'insensibilité à la casse
-            if extension in self.linters:
-                original_content = content
-                linted_content = self.linters[extension](content, config)
-                if linted_content != original_content:
-                    print(f"Linté {filename}.")
-                else:
+            # S'assurer de l'insensibilité à la casse
+            extension = splitext(filename)[1].lower()
+            linter = self.linters.get(extension)
+            if linter is not None:
+                content_hash = self._content_hash(extension, config_key, content)
+                if content_hash in self._clean_hashes:
                     print(f"Aucun changement fait pour {filename}.")
-                files_dict[filename] = linted_content
+                else:
+                    tasks.append((filename, extension, linter, content))
             else:
                 print(f"Aucun linter enregistré pour {filename}.")
-        return files_dict
\ No newline at end of file
+
+        for (filename, extension, _, original_content), (linted_content, success) in zip(
+            tasks, self._run_linters(tasks, config)
+        ):
+            if linted_content != original_content:
+                print(f"Linté {filename}.")
+            else:
+                print(f"Aucun changement fait pour {filename}.")
+            files_dict[filename] = linted_content
+            # Le résultat d'un formatage réussi est lui-même conforme ; un contenu
+            # en échec est relinté à chaque fois pour que l'erreur reste visible
+            if success:
+                self._clean_hashes.add(
+                    self._content_hash(extension, config_key, linted_content)
+                )
+        return files_dict
+
+    @staticmethod
+    def _content_hash(extension: str, config_key: str, content: str) -> str:
+        """
+        Calcule l'empreinte d'un contenu pour un linter et une configuration donnés.
+
+        Args:
+            extension: L'extension qui détermine le linter
+            config_key: La représentation stable de la configuration
+            content: Le contenu du fichier
+
+        Returns:
+            L'empreinte SHA-256 hexadécimale
+        """
+        digest = hashlib.sha256(f"{extension}\0{config_key}\0".encode("utf-8"))
+        digest.update(content.encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _run_linters(tasks, config):
+        """
+        Applique les linters aux fichiers, en parallèle dans des processus séparés
+        lorsque le volume de code le justifie (black est du Python pur qui garde le GIL).
+
+        Args:
+            tasks: Liste de tuples (nom du fichier, extension, linter, contenu)
+            config: Configuration passée à chaque linter
+
+        Returns:
+            La liste des couples (contenu linté, succès), dans l'ordre des tâches
+        """
+        linters = [linter for _, _, linter, _ in tasks]
+        contents = [content for _, _, _, content in tasks]
+        if (
+            len(tasks) > 1
+            and sum(map(len, contents)) >= PARALLEL_LINT_MIN_BYTES
+            and _picklable(set(linters), config)
+        ):
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=min(os.cpu_count() or 1, len(tasks))
+                ) as executor:
+                    return list(
+                        executor.map(_apply_linter, linters, contents, repeat(config))
+                    )
+            except BrokenProcessPool:
+                # Processus de linting interrompu (mémoire, signal...) : on refait
+                # le travail dans le processus courant. Les exceptions levées par
+                # les linters eux-mêmes sont propagées.
+                pass
+        return [linter(content, config) for linter, content in zip(linters, contents)]
+
+
+def _picklable(*objects) -> bool:
+    """
+    Indique si des objets peuvent être envoyés aux processus de linting.
+
+    Args:
+        *objects: Les linters et la configuration à transmettre
+
+    Returns:
+        False si l'un d'eux n'est pas sérialisable (lambda, fonction locale...)
+    """
+    try:
+        pickle.dumps(objects)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def _apply_linter(linter, content, config):
+    """Applique un linter à un contenu ; point d'entrée des processus de linting."""
+    return linter(content, config)
\ No newline at end of file
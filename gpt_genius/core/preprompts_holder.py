@@ -2,10 +2,47 @@
 Module pour gérer les preprompts stockés sur disque.
 """
 
+import os
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
-from gpt_genius.core.default.disk_memory import DiskMemory
+
+def _scan_preprompts(preprompts_path: Path) -> Tuple[Tuple[str, str, int, int], ...]:
+    """
+    Liste les fichiers de premier niveau d'un répertoire de preprompts avec `os.scandir`.
+
+    Args:
+        preprompts_path: Le chemin du répertoire des preprompts
+
+    Returns:
+        Les quadruplets (nom, chemin, date de modification, taille) triés par nom,
+        qui identifient l'état du répertoire et de chaque fichier
+    """
+    files = []
+    with os.scandir(preprompts_path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((entry.name, entry.path, stat.st_mtime_ns, stat.st_size))
+    files.sort()
+    return tuple(files)
+
+
+def _read_preprompts(files: Tuple[Tuple[str, str, int, int], ...]) -> Dict[str, str]:
+    """
+    Lit les fichiers de preprompts listés par `_scan_preprompts`.
+
+    Args:
+        files: Les quadruplets (nom, chemin, date de modification, taille)
+
+    Returns:
+        Dictionnaire avec les noms de fichiers comme clés et le contenu comme valeurs
+    """
+    preprompts = {}
+    for name, path, _, _ in files:
+        with open(path, "r", encoding="utf-8") as f:
+            preprompts[name] = f.read()
+    return preprompts
 
 
 class PrepromptsHolder:
@@ -24,6 +61,9 @@ class PrepromptsHolder:
             preprompts_path: Le chemin vers le répertoire contenant les textes de preprompt
         """
         self.preprompts_path = preprompts_path
+        # (état des fichiers, preprompts lus dans cet état) : la date de
+        # modification du répertoire ne change pas quand un fichier est édité
+        self._cache: Optional[Tuple[tuple, Dict[str, str]]] = None
 
     def get_preprompts(self) -> Dict[str, str]:
         """
@@ -32,5 +72,9 @@ class PrepromptsHolder:
         Returns:
             Dictionnaire avec les noms de fichiers comme clés et le contenu comme valeurs
         """
-        preprompts_repo = DiskMemory(self.preprompts_path)
-        return {file_name: preprompts_repo[file_name] for file_name in preprompts_repo}
\ No newline at end of file
+        files = _scan_preprompts(self.preprompts_path)
+        if self._cache is None or self._cache[0] != files:
+            self._cache = (files, _read_preprompts(files))
+        # Copie superficielle : l'appelant peut modifier le dictionnaire sans
+        # altérer le cache
+        return dict(self._cache[1])
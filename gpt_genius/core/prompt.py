@@ -3,13 +3,31 @@ Module de gestion des prompts pour GPT Genius.
 """
 
 import json
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
+
+# orjson sérialise nettement plus vite que json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Attributs sérialisés par Prompt.to_dict : les modifier invalide le cache
+_DICT_FIELDS = frozenset({"text", "image_urls", "entrypoint_prompt"})
 
 
 class Prompt:
     """
     Classe pour gérer les prompts avec support d'images et de contenus structurés.
     """
+
+    # Pas de __dict__ par instance : attributs stockés dans des emplacements fixes
+    __slots__ = (
+        "text",
+        "image_urls",
+        "entrypoint_prompt",
+        "_cached_dict",
+        "_image_content",
+    )
     
     def __init__(
         self,
@@ -29,6 +47,39 @@ class Prompt:
         self.image_urls = image_urls
         self.entrypoint_prompt = entrypoint_prompt
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in _DICT_FIELDS:
+            super().__setattr__("_cached_dict", None)
+        # Les contenus d'images sont précalculés à chaque affectation de
+        # image_urls, plutôt qu'à chaque appel de to_langchain_content
+        if name == "image_urls":
+            super().__setattr__("_image_content", self._build_image_content(value))
+
+    @staticmethod
+    def _build_image_content(image_urls: Optional[Dict[str, str]]) -> List[dict]:
+        """
+        Construit les contenus LangChain des images du prompt.
+
+        Args:
+            image_urls: Dictionnaire optionnel d'URLs d'images {nom: url}
+
+        Returns:
+            Liste de contenus d'images formatés pour LangChain
+        """
+        if not image_urls:
+            return []
+        return [
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": url,
+                    "detail": "low",
+                },
+            }
+            for url in image_urls.values()
+        ]
+
     def __repr__(self):
         return f"Prompt(text={self.text!r}, image_urls={self.image_urls!r})"
 
@@ -39,33 +90,25 @@ class Prompt:
         Returns:
             Liste de contenus formatés pour LangChain
         """
-        content = [{"type": "text", "text": f"Request: {self.text}"}]
-
-        if self.image_urls:
-            for name, url in self.image_urls.items():
-                image_content = {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": url,
-                        "detail": "low",
-                    },
-                }
-                content.append(image_content)
-
-        return content
+        return [{"type": "text", "text": f"Request: {self.text}"}, *self._image_content]
 
     def to_dict(self):
         """
         Convertit le prompt en dictionnaire.
+
+        Le dictionnaire est mis en cache jusqu'à la prochaine modification d'un
+        attribut du prompt : il ne doit pas être modifié par l'appelant.
         
         Returns:
             Dictionnaire contenant les données du prompt
         """
-        return {
-            "text": self.text,
-            "image_urls": self.image_urls,
-            "entrypoint_prompt": self.entrypoint_prompt,
-        }
+        if self._cached_dict is None:
+            self._cached_dict = {
+                "text": self.text,
+                "image_urls": self.image_urls,
+                "entrypoint_prompt": self.entrypoint_prompt,
+            }
+        return self._cached_dict
 
     def to_json(self):
         """
@@ -74,4 +117,8 @@ class Prompt:
         Returns:
             Chaîne JSON représentant le prompt
         """
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2).decode(
+                "utf-8"
+            )
         return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
\ No newline at end of file
@@ -2,12 +2,18 @@
 Module de gestion de l'usage des tokens pour GPT Genius.
 """
 
+import array
 import base64
+import csv
+import functools
 import io
 import logging
 import math
-from dataclasses import dataclass
-from typing import List, Union
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Dict, Iterator, List, Tuple, Union
 
 import tiktoken
 from langchain.schema import AIMessage, HumanMessage, SystemMessage
@@ -31,6 +37,19 @@ except ImportError:
 
 Message = Union[AIMessage, HumanMessage, SystemMessage]
 
+# Threads utilisés par tiktoken pour tokeniser les messages d'une conversation
+ENCODE_BATCH_THREADS = os.cpu_count() or 1
+# Volume de texte (en caractères) à partir duquel les messages sont tokenisés en
+# un appel groupé : en dessous, créer un pool de threads à chaque appel coûte
+# plus cher que l'encodage séquentiel
+ENCODE_BATCH_MIN_CHARS = 64 * 1024
+
+# Pool partagé pour tokeniser en parallèle le prompt et la réponse d'une étape
+# (tiktoken relâche le GIL pendant l'encodage)
+_TOK_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tokenizer")
+# Nombre maximal d'images dont le coût en tokens est mémorisé par Tokenizer
+IMAGE_TOKENS_CACHE_SIZE = 512
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,6 +67,73 @@ class TokenUsage:
     total_tokens: int
 
 
+# En-tête CSV de `TokenUsageLog.format_log`, dans l'ordre des champs de TokenUsage
+_LOG_CSV_HEADER = (
+    "step_name",
+    "prompt_tokens_in_step",
+    "completion_tokens_in_step",
+    "total_tokens_in_step",
+    "total_prompt_tokens",
+    "total_completion_tokens",
+    "total_tokens",
+)
+# Colonnes entières de TokenUsage, stockées chacune dans un tableau compact
+_INT_FIELDS = tuple(field.name for field in fields(TokenUsage))[1:]
+
+
+@functools.lru_cache(maxsize=8)
+def _get_encoder(model_name: str) -> tiktoken.Encoding:
+    """
+    Retourne l'encodeur tiktoken d'un modèle, partagé entre tous les Tokenizer.
+
+    Args:
+        model_name: Le nom du modèle
+
+    Returns:
+        L'encodeur tiktoken correspondant
+    """
+    if "gpt-4" in model_name or "gpt-3.5" in model_name:
+        return tiktoken.encoding_for_model(model_name)
+    return tiktoken.get_encoding("cl100k_base")
+
+
+@functools.lru_cache(maxsize=256)
+def _tile_tokens(width: int, height: int) -> int:
+    """
+    Calcule le coût en tokens d'une image en détail élevé à partir de ses dimensions,
+    selon les règles de découpage en tuiles d'OpenAI.
+
+    Args:
+        width: La largeur de l'image en pixels
+        height: La hauteur de l'image en pixels
+
+    Returns:
+        La taille des tokens de l'image
+    """
+    # Calculer l'échelle initiale pour tenir dans 2048 carré tout en maintenant le ratio d'aspect
+    max_dimension = max(width, height)
+    scale_factor = min(2048 / max_dimension, 1)  # S'assurer qu'on ne met pas à l'échelle vers le haut
+    new_width = int(width * scale_factor)
+    new_height = int(height * scale_factor)
+
+    # Mettre à l'échelle de sorte que le côté le plus court soit 768px
+    shortest_side = min(new_width, new_height)
+    if shortest_side > 768:
+        resize_factor = 768 / shortest_side
+        new_width = int(new_width * resize_factor)
+        new_height = int(new_height * resize_factor)
+
+    # Calculer le nombre de tuiles 512px nécessaires
+    width_tiles = math.ceil(new_width / 512)
+    height_tiles = math.ceil(new_height / 512)
+    total_tiles = width_tiles * height_tiles
+
+    # Chaque tuile coûte 170 tokens, plus un coût de base de 85 tokens pour le détail élevé
+    token_cost = total_tiles * 170 + 85
+
+    return token_cost
+
+
 class Tokenizer:
     """
     Tokenizer pour compter les tokens dans le texte.
@@ -55,11 +141,10 @@ class Tokenizer:
 
     def __init__(self, model_name):
         self.model_name = model_name
-        self._tiktoken_tokenizer = (
-            tiktoken.encoding_for_model(model_name)
-            if "gpt-4" in model_name or "gpt-3.5" in model_name
-            else tiktoken.get_encoding("cl100k_base")
-        )
+        self._tiktoken_tokenizer = _get_encoder(model_name)
+        # Coût des images déjà vues, indexé par (empreinte, longueur) de la chaîne
+        # base64 : la même image revient à chaque étape d'une conversation
+        self._image_tokens_cache: Dict[Tuple[int, int], int] = {}
 
     def num_tokens(self, txt: str) -> int:
         """
@@ -71,6 +156,11 @@ class Tokenizer:
         Returns:
             Le nombre de tokens dans le texte
         """
+        if not txt:
+            return 0
+        if len(txt) <= 3:
+            # Trop court pour contenir un token spécial : pas besoin de les rechercher
+            return len(self._tiktoken_tokenizer.encode_ordinary(txt))
         return len(self._tiktoken_tokenizer.encode(txt))
 
     def num_tokens_for_base64_image(
@@ -90,34 +180,37 @@ class Tokenizer:
         if detail == "low":
             return 85  # Coût fixe pour les images de faible détail
 
-        # Décoder l'image depuis base64
-        image_data = base64.b64decode(image_base64)
+        key = (hash(image_base64), len(image_base64))
+        token_cost = self._image_tokens_cache.get(key)
+        if token_cost is None:
+            token_cost = self._compute_image_tokens(image_base64)
+            if len(self._image_tokens_cache) >= IMAGE_TOKENS_CACHE_SIZE:
+                # Éviction de l'entrée la plus ancienne
+                self._image_tokens_cache.pop(next(iter(self._image_tokens_cache)), None)
+            self._image_tokens_cache[key] = token_cost
+        return token_cost
 
-        # Convertir les données d'octets en image pour l'extraction de taille
-        image = Image.open(io.BytesIO(image_data))
+    @staticmethod
+    def _compute_image_tokens(image_base64: str) -> int:
+        """
+        Calcule le coût en tokens d'une image en détail élevé.
 
-        # Calculer l'échelle initiale pour tenir dans 2048 carré tout en maintenant le ratio d'aspect
-        max_dimension = max(image.size)
-        scale_factor = min(2048 / max_dimension, 1)  # S'assurer qu'on ne met pas à l'échelle vers le haut
-        new_width = int(image.size[0] * scale_factor)
-        new_height = int(image.size[1] * scale_factor)
+        Seul l'en-tête de l'image est lu pour obtenir sa taille : les pixels ne
+        sont pas décodés.
 
-        # Mettre à l'échelle de sorte que le côté le plus court soit 768px
-        shortest_side = min(new_width, new_height)
-        if shortest_side > 768:
-            resize_factor = 768 / shortest_side
-            new_width = int(new_width * resize_factor)
-            new_height = int(new_height * resize_factor)
+        Args:
+            image_base64: La chaîne encodée en base64 de l'image
 
-        # Calculer le nombre de tuiles 512px nécessaires
-        width_tiles = math.ceil(new_width / 512)
-        height_tiles = math.ceil(new_height / 512)
-        total_tiles = width_tiles * height_tiles
+        Returns:
+            La taille des tokens de l'image
+        """
+        # Décoder l'image depuis base64
+        image_data = base64.b64decode(image_base64)
 
-        # Chaque tuile coûte 170 tokens, plus un coût de base de 85 tokens pour le détail élevé
-        token_cost = total_tiles * 170 + 85
+        # Convertir les données d'octets en image pour l'extraction de taille
+        image = Image.open(io.BytesIO(image_data))
 
-        return token_cost
+        return _tile_tokens(*image.size)
 
     def num_tokens_from_messages(self, messages: List[Message]) -> int:
         """
@@ -130,18 +223,19 @@ class Tokenizer:
         Returns:
             Le nombre total de tokens utilisés par les messages
         """
-        n_tokens = 0
+        # 4 tokens de cadrage par message, plus 2 pour la réponse de l'assistant
+        n_tokens = 6 * len(messages)
+        # Les textes sont collectés puis tokenisés ensemble
+        texts = []
         for message in messages:
-            n_tokens += 4  # Compte pour les tokens de cadrage des messages
-
             if isinstance(message.content, str):
                 # Le contenu est une chaîne simple
-                n_tokens += self.num_tokens(message.content)
+                texts.append(message.content)
             elif isinstance(message.content, list):
                 # Le contenu est une liste, potentiellement mélangée avec texte et images
                 for item in message.content:
                     if item.get("type") == "text":
-                        n_tokens += self.num_tokens(item["text"])
+                        texts.append(item["text"])
                     elif item.get("type") == "image_url":
                         image_detail = item["image_url"].get("detail", "high")
                         image_base64 = item["image_url"].get("url")
@@ -149,7 +243,13 @@ class Tokenizer:
                             image_base64, detail=image_detail
                         )
 
-            n_tokens += 2  # Compte pour les tokens de cadrage de la réponse de l'assistant
+        if len(texts) > 1 and sum(map(len, texts)) >= ENCODE_BATCH_MIN_CHARS:
+            encoded = self._tiktoken_tokenizer.encode_batch(
+                texts, num_threads=min(ENCODE_BATCH_THREADS, len(texts))
+            )
+            n_tokens += sum(map(len, encoded))
+        else:
+            n_tokens += sum(map(self.num_tokens, texts))
 
         return n_tokens
 
@@ -164,8 +264,15 @@ class TokenUsageLog:
         self._cumulative_prompt_tokens = 0
         self._cumulative_completion_tokens = 0
         self._cumulative_total_tokens = 0
-        self._log = []
+        # Journal en colonnes : un tableau d'entiers 64 bits par champ numérique
+        # de TokenUsage, plutôt qu'un objet par étape
+        self._step_names: List[str] = []
+        self._columns: Dict[str, array.array] = {
+            name: array.array("q") for name in _INT_FIELDS
+        }
         self._tokenizer = Tokenizer(model_name)
+        # Les complétions concurrentes (AI.abatch) peuvent mettre à jour le journal en parallèle
+        self._lock = threading.Lock()
 
     def update_log(self, messages: List[Message], answer: str, step_name: str) -> None:
         """
@@ -176,25 +283,37 @@ class TokenUsageLog:
             answer: La réponse de l'IA
             step_name: Le nom de l'étape
         """
-        prompt_tokens = self._tokenizer.num_tokens_from_messages(messages)
+        prompt_future = _TOK_POOL.submit(
+            self._tokenizer.num_tokens_from_messages, messages
+        )
         completion_tokens = self._tokenizer.num_tokens(answer)
+        prompt_tokens = prompt_future.result()
         total_tokens = prompt_tokens + completion_tokens
 
-        self._cumulative_prompt_tokens += prompt_tokens
-        self._cumulative_completion_tokens += completion_tokens
-        self._cumulative_total_tokens += total_tokens
-
-        self._log.append(
-            TokenUsage(
-                step_name=step_name,
-                in_step_prompt_tokens=prompt_tokens,
-                in_step_completion_tokens=completion_tokens,
-                in_step_total_tokens=total_tokens,
-                total_prompt_tokens=self._cumulative_prompt_tokens,
-                total_completion_tokens=self._cumulative_completion_tokens,
-                total_tokens=self._cumulative_total_tokens,
+        with self._lock:
+            self._cumulative_prompt_tokens += prompt_tokens
+            self._cumulative_completion_tokens += completion_tokens
+            self._cumulative_total_tokens += total_tokens
+
+            columns = self._columns
+            self._step_names.append(step_name)
+            columns["in_step_prompt_tokens"].append(prompt_tokens)
+            columns["in_step_completion_tokens"].append(completion_tokens)
+            columns["in_step_total_tokens"].append(total_tokens)
+            columns["total_prompt_tokens"].append(self._cumulative_prompt_tokens)
+            columns["total_completion_tokens"].append(
+                self._cumulative_completion_tokens
             )
-        )
+            columns["total_tokens"].append(self._cumulative_total_tokens)
+
+    def _rows(self) -> Iterator[Tuple]:
+        """
+        Parcourt le journal ligne par ligne, dans l'ordre des champs de TokenUsage.
+
+        Returns:
+            Un itérateur de tuples (step_name, colonnes numériques...)
+        """
+        return zip(self._step_names, *(self._columns[name] for name in _INT_FIELDS))
 
     def log(self) -> List[TokenUsage]:
         """
@@ -203,7 +322,7 @@ class TokenUsageLog:
         Returns:
             Un journal des détails d'usage des tokens par étape dans la conversation
         """
-        return self._log
+        return [TokenUsage(*row) for row in self._rows()]
 
     def format_log(self) -> str:
         """
@@ -212,10 +331,11 @@ class TokenUsageLog:
         Returns:
             Le journal d'usage des tokens formaté comme une chaîne CSV
         """
-        result = "step_name,prompt_tokens_in_step,completion_tokens_in_step,total_tokens_in_step,total_prompt_tokens,total_completion_tokens,total_tokens\n"
-        for log in self._log:
-            result += f"{log.step_name},{log.in_step_prompt_tokens},{log.in_step_completion_tokens},{log.in_step_total_tokens},{log.total_prompt_tokens},{log.total_completion_tokens},{log.total_tokens}\n"
-        return result
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(_LOG_CSV_HEADER)
+        writer.writerows(self._rows())
+        return buffer.getvalue()
 
     def is_openai_model(self) -> bool:
         """
@@ -240,21 +360,22 @@ class TokenUsageLog:
         Retourne le coût total en USD de l'usage de l'API.
 
         Returns:
-            Coût en USD
+            Coût en USD, 0.0 si aucune étape n'a été journalisée, ou None si le
+            modèle n'est pas un modèle OpenAI ou n'a pas de tarif connu
         """
         if not self.is_openai_model():
             return None
+        if not self._step_names:
+            return 0.0
 
         try:
-            result = 0
-            for log in self.log():
-                result += get_openai_token_cost_for_model(
-                    self.model_name, log.total_prompt_tokens, is_completion=False
-                )
-                result += get_openai_token_cost_for_model(
-                    self.model_name, log.total_completion_tokens, is_completion=True
-                )
-            return result
+            # Le coût se calcule sur les totaux cumulés : sommer les totaux de
+            # chaque étape compterait plusieurs fois les tokens des étapes passées
+            return get_openai_token_cost_for_model(
+                self.model_name, self._cumulative_prompt_tokens, is_completion=False
+            ) + get_openai_token_cost_for_model(
+                self.model_name, self._cumulative_completion_tokens, is_completion=True
+            )
         except Exception as e:
             logger.error(f"Erreur lors du calcul du coût d'usage : {e}")
             return None
\ No newline at end of file
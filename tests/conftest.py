@@ -0,0 +1,46 @@
+"""
+Fixtures partagées par les tests de GPT Genius.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from gpt_genius.core.files_dict import FilesDict
+
+
+@pytest.fixture(scope="session")
+def ram_tmp_root():
+    """Répertoire temporaire unique pour la session, en mémoire (/dev/shm) si possible."""
+    root = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    path = Path(tempfile.mkdtemp(dir=root))
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def disk_memory_dir(ram_tmp_root, request):
+    """Sous-répertoire propre au test courant dans le répertoire de session."""
+    path = ram_tmp_root / request.node.name
+    path.mkdir()
+    return path
+
+
+@pytest.fixture(scope="session")
+def hello_files():
+    """Fichiers d'exemple validés une seule fois ; chaque test en fait une copie."""
+    files = FilesDict()
+    files["main.py"] = "print('Hello World')"
+    files["requirements.txt"] = "numpy>=1.0.0"
+    return dict(files)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def gpt_genius_module():
+    """Importe le package une seule fois, avant le premier test de la session."""
+    import gpt_genius
+
+    return gpt_genius
@@ -0,0 +1,50 @@
+"""
+Benchmarks des entrées/sorties de FileStore.
+
+Exclus par défaut ; à lancer avec `pytest -m benchmark` (nécessite pytest-benchmark).
+"""
+
+import itertools
+
+import pytest
+
+from gpt_genius.core.default.file_store import FileStore
+from gpt_genius.core.files_dict import FilesDict
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.benchmark(group="filestore")
+
+# Nombre de petits fichiers générés, répartis dans quelques sous-répertoires
+_N_FILES = 1000
+
+
+@pytest.fixture(scope="module")
+def hello_files_large():
+    """Un millier de petits fichiers Python répartis dans dix répertoires."""
+    return FilesDict(
+        (f"pkg{i % 10}/module_{i}.py", f"def f_{i}():\n    return {i}\n")
+        for i in range(_N_FILES)
+    )
+
+
+def test_push_benchmark(benchmark, hello_files_large, tmp_path):
+    """Mesure l'écriture des fichiers dans un répertoire de travail vide."""
+    counter = itertools.count()
+
+    def setup():
+        # Un nouveau répertoire par tour : sinon les fichiers inchangés
+        # ne seraient plus réécrits
+        return (FileStore(tmp_path / f"push-{next(counter)}"), hello_files_large), {}
+
+    benchmark.pedantic(FileStore.push, setup=setup, rounds=20)
+
+
+def test_pull_benchmark(benchmark, hello_files_large, tmp_path):
+    """Mesure la lecture de tous les fichiers du répertoire de travail."""
+    store = FileStore(tmp_path / "pull")
+    store.push(hello_files_large)
+
+    pulled = benchmark(store.pull)
+
+    assert pulled == hello_files_large
@@ -2,15 +2,50 @@
 Tests pour les modules core de GPT Genius.
 """
 
+import asyncio
+import json
+import os
 import pytest
-import tempfile
+import re
+import time
 from pathlib import Path
+from types import SimpleNamespace
 
+import httpx
+import openai
+from langchain.schema import AIMessage, HumanMessage
+
+from gpt_genius.core.ai import BATCH_POLL_INTERVAL
+from gpt_genius.core.chat_to_files import (
+    ChatToFilesCallbackHandler,
+    chat_to_files_dict,
+)
+from gpt_genius.core.preprompts_holder import PrepromptsHolder
 from gpt_genius.core.prompt import Prompt
-from gpt_genius.core.files_dict import FilesDict
+from gpt_genius.core.files_dict import FilesDict, file_to_lines_dict
+from gpt_genius.core.linting import PARALLEL_LINT_MIN_BYTES, Linting
+from gpt_genius.core.default.disk_execution_env import DiskExecutionEnv
 from gpt_genius.core.default.disk_memory import DiskMemory
 from gpt_genius.core.default.file_store import FileStore
 
+# Contenus d'exemple, identiques à ceux de la fixture hello_files
+_MAIN_PY = "print('Hello World')"
+_REQ = "numpy>=1.0.0"
+
+
+class TestLazyExports:
+    """Tests pour les exports chargés à la demande des paquets."""
+    
+    def test_exports_resolve_and_are_listed(self):
+        """Test que les exports se résolvent, sont mémorisés et apparaissent dans dir()."""
+        import gpt_genius.core.default as default
+        
+        assert default.FileStore is FileStore
+        assert vars(default)["FileStore"] is FileStore
+        assert set(default.__all__) <= set(dir(default))
+        with pytest.raises(AttributeError, match="Inconnu"):
+            default.Inconnu
+
 
 class TestPrompt:
     """Tests pour la classe Prompt."""
@@ -41,6 +76,10 @@ class TestPrompt:
         assert result["text"] == "test"
         assert result["entrypoint_prompt"] == "run tests"
         assert result["image_urls"] is None
+        assert prompt.to_dict() is result
+        
+        prompt.text = "autre"
+        assert prompt.to_dict()["text"] == "autre"
 
 
 class TestFilesDict:
@@ -49,70 +88,208 @@ class TestFilesDict:
     def test_create_files_dict(self):
         """Test de création d'un FilesDict."""
         files = FilesDict()
-        files["main.py"] = "print('Hello World')"
+        files["main.py"] = _MAIN_PY
         
-        assert files["main.py"] == "print('Hello World')"
+        assert files["main.py"] == _MAIN_PY
         assert len(files) == 1
     
-    def test_type_validation(self):
-        """Test de validation des types."""
+    @pytest.mark.parametrize(
+        "key,value,ok",
+        [
+            ("test.py", "code", True),
+            (Path("test2.py"), "code2", True),
+            (123, "code", False),
+            ("test.py", 123, False),
+        ],
+    )
+    def test_type_validation(self, key, value, ok):
+        """Test de validation des types : string et Path acceptés, le reste rejeté."""
+        files = FilesDict()
+        
+        if ok:
+            files[key] = value
+            assert files[str(key)] == value
+        else:
+            with pytest.raises(TypeError):
+                files[key] = value
+    
+    def test_bytes_path_key_is_decoded(self):
+        """Test qu'un chemin dont __fspath__ renvoie des octets devient une clé str décodée."""
+        class BytesPath:
+            def __fspath__(self):
+                return "src/é.py".encode()
+        
         files = FilesDict()
+        files[BytesPath()] = "code"
         
-        # Doit accepter string et Path
-        files["test.py"] = "code"
-        files[Path("test2.py")] = "code2"
+        assert list(files) == ["src/é.py"]
+    
+    def test_copy(self, hello_files):
+        """Test que la copie reste un FilesDict indépendant."""
+        files = FilesDict(hello_files)
         
-        # Doit rejeter les types incorrects
-        with pytest.raises(TypeError):
-            files[123] = "code"
+        copied = files.copy()
+        copied["other.py"] = "pass"
         
-        with pytest.raises(TypeError):
-            files["test.py"] = 123
+        assert isinstance(copied, FilesDict)
+        assert copied["main.py"] == _MAIN_PY
+        assert "other.py" not in files
     
-    def test_to_chat(self):
+    @pytest.mark.parametrize(
+        "contents,needles",
+        [
+            (
+                {"main.py": "def hello():\n    print('Hello')"},
+                ["File: main.py", "def hello():", "```"],
+            ),
+            ({"a.py": "x=1", "b.py": "y=2"}, ["File: a.py", "File: b.py"]),
+        ],
+    )
+    def test_to_chat(self, contents, needles):
         """Test de conversion pour chat."""
-        files = FilesDict()
-        files["main.py"] = "def hello():\n    print('Hello')"
+        result = FilesDict(contents).to_chat()
+        # Une seule passe sur le résultat pour toutes les chaînes attendues
+        pattern = re.compile("|".join(map(re.escape, needles)))
+        assert set(pattern.findall(result)) >= set(needles)
+        assert FilesDict(contents).to_chat_bytes() == result.encode("utf-8")
+    
+    @pytest.mark.parametrize(
+        "content,expected",
+        [
+            ("a\nb\n", {1: "a", 2: "b"}),
+            ("a\n\n", {1: "a", 2: ""}),
+            ("a\rb\x0cc\u2028d", {1: "a\rb\x0cc\u2028d"}),
+            ("", {1: ""}),
+        ],
+    )
+    def test_file_to_lines_dict(self, content, expected):
+        """Test que seuls les "\\n" séparent les lignes, sans ligne finale vide."""
+        assert file_to_lines_dict(content) == expected
+
+
+class TestChatToFiles:
+    """Tests pour l'analyse des chats en fichiers."""
+    
+    def test_chat_to_files_dict(self):
+        """Test d'extraction des fichiers et nettoyage des chemins."""
+        chat = (
+            "Voici le code.\n\n"
+            "src/hello_world.py\n```python\nprint('Hello World')\n```\n\n"
+            "[requirements.txt]\n```\nnumpy\n```\n\n"
+            "**`run.sh`:**\n\n```bash\necho hi\n```\n"
+        )
+        files = chat_to_files_dict(chat)
+        
+        assert isinstance(files, FilesDict)
+        assert files == {
+            "src/hello_world.py": "print('Hello World')",
+            "requirements.txt": "numpy",
+            "run.sh": "echo hi",
+        }
+    
+    def test_chat_to_files_dict_skips_anonymous_blocks(self):
+        """Test que les blocs de code sans chemin ne créent pas de fichier."""
+        chat = "```\nsortie\n```\nmain.py\n```\nprint(1)\n```\n"
+        
+        assert chat_to_files_dict(chat) == {"main.py": "print(1)"}
+    
+    def test_callback_handler_streams_files(self):
+        """Test que le handler émet les fichiers au fil des tokens reçus."""
+        chat = (
+            "src/hello_world.py\n```python\nprint('Hello World')\n```\n\n"
+            "[requirements.txt]\n```\nnumpy\n```"
+        )
+        received = []
+        handler = ChatToFilesCallbackHandler(lambda path, content: received.append(path))
         
-        result = files.to_chat()
-        assert "File: main.py" in result
-        assert "def hello():" in result
-        assert "```" in result
+        handler.on_chat_model_start({}, [])
+        for token in chat:
+            handler.on_llm_new_token(token)
+        # Le premier fichier est émis avant la fin de la génération
+        assert received == ["src/hello_world.py"]
+        handler.on_llm_end(None)
+        
+        assert received == list(chat_to_files_dict(chat))
 
 
 class TestDiskMemory:
     """Tests pour la classe DiskMemory."""
     
-    def test_create_memory(self):
+    def test_create_memory(self, disk_memory_dir):
         """Test de création d'une mémoire disque."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            memory = DiskMemory(temp_dir)
-            assert memory.path == Path(temp_dir).absolute()
+        memory = DiskMemory(disk_memory_dir)
+        assert memory.path == disk_memory_dir.absolute()
     
-    def test_store_and_retrieve(self):
+    def test_store_and_retrieve(self, disk_memory_dir):
         """Test de stockage et récupération."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            memory = DiskMemory(temp_dir)
-            
-            # Stocker un fichier
-            memory["test.txt"] = "contenu de test"
-            
-            # Vérifier qu'il existe
-            assert "test.txt" in memory
-            assert memory["test.txt"] == "contenu de test"
+        memory = DiskMemory(disk_memory_dir)
+        
+        # Stocker un fichier
+        memory["test.txt"] = "contenu de test"
+        
+        # Vérifier qu'il existe
+        assert "test.txt" in memory
+        assert memory["test.txt"] == "contenu de test"
     
-    def test_iteration(self):
+    def test_iteration(self, disk_memory_dir):
         """Test d'itération."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            memory = DiskMemory(temp_dir)
-            
-            memory["file1.txt"] = "contenu1"
-            memory["file2.txt"] = "contenu2"
-            
-            files = list(memory)
-            assert len(files) == 2
-            assert "file1.txt" in files
-            assert "file2.txt" in files
+        memory = DiskMemory(disk_memory_dir)
+        
+        memory.update({"file1.txt": "contenu1", "file2.txt": "contenu2"})
+        
+        seen = set(memory)
+        assert seen == {"file1.txt", "file2.txt"}
+    
+    def test_sees_nested_writes_from_other_instances(self, disk_memory_dir):
+        """Test qu'un fichier imbriqué écrit par une autre instance est visible."""
+        memory = DiskMemory(disk_memory_dir)
+        memory["src/main.py"] = _MAIN_PY
+        assert memory.to_path_list_string() == "src/main.py"
+        
+        DiskMemory(disk_memory_dir)["src/util.py"] = "x = 1"
+        
+        assert memory.to_path_list_string() == "src/main.py\nsrc/util.py"
+        assert list(memory) == ["src/main.py", "src/util.py"]
+        assert len(memory) == 2
+        assert memory.to_dict() == {"src/main.py": _MAIN_PY, "src/util.py": "x = 1"}
+    
+    def test_symlink_loop(self, disk_memory_dir):
+        """Test qu'un lien symbolique vers un répertoire parent n'est pas suivi."""
+        memory = DiskMemory(disk_memory_dir)
+        memory["a/f.txt"] = "contenu"
+        try:
+            os.symlink("..", disk_memory_dir / "a" / "loop")
+        except (OSError, NotImplementedError):
+            pytest.skip("liens symboliques non supportés")
+        
+        assert list(memory) == ["a/f.txt"]
+        assert len(memory) == 1
+        assert list(FileStore(disk_memory_dir).pull()) == ["a/f.txt"]
+    
+    def test_image_base64(self, disk_memory_dir):
+        """Test de l'encodage Base64 des images, sur plusieurs blocs de lecture."""
+        import base64
+        
+        data = bytes(range(256)) * 200
+        (disk_memory_dir / "image.png").write_bytes(data)
+        memory = DiskMemory(disk_memory_dir)
+        
+        expected = base64.b64encode(data).decode("ascii")
+        assert memory["image.png"] == f"data:image/png;base64,{expected}"
+    
+    def test_to_json_stream(self, disk_memory_dir):
+        """Test que l'écriture JSON en flux produit le même résultat que to_json."""
+        import io
+        
+        memory = DiskMemory(disk_memory_dir)
+        memory["src/main.py"] = 'print("é")\n'
+        memory["notes.txt"] = "contenu"
+        
+        out = io.StringIO()
+        memory.to_json_stream(out)
+        
+        assert out.getvalue() == memory.to_json()
+        assert json.loads(out.getvalue()) == memory.to_dict()
 
 
 class TestFileStore:
@@ -124,14 +301,12 @@ class TestFileStore:
         assert store.working_dir.exists()
         assert store.working_dir.is_dir()
     
-    def test_push_and_pull(self):
+    def test_push_and_pull(self, hello_files):
         """Test de push et pull de fichiers."""
         store = FileStore()
         
         # Créer des fichiers
-        files = FilesDict()
-        files["main.py"] = "print('Hello World')"
-        files["requirements.txt"] = "numpy>=1.0.0"
+        files = FilesDict(hello_files)
         
         # Push
         store.push(files)
@@ -142,17 +317,555 @@ class TestFileStore:
         
         # Pull
         pulled_files = store.pull()
-        assert "main.py" in pulled_files
-        assert "requirements.txt" in pulled_files
-        assert pulled_files["main.py"] == "print('Hello World')"
+        assert pulled_files["main.py"] == _MAIN_PY
+        assert pulled_files["requirements.txt"] == _REQ
+    
+    def test_pull_skips_binary_files(self):
+        """Test que les fichiers binaires sont omis du pull et jamais réécrits."""
+        store = FileStore()
+        png = b"\x89PNG\r\n\x1a\n" + bytes(range(256))
+        blob = b"\xff\xfe\x00donnees"
+        (store.working_dir / "logo.png").write_bytes(png)
+        (store.working_dir / "data.bin").write_bytes(blob)
+        store.push(FilesDict({"main.py": _MAIN_PY}))
+        
+        pulled = store.pull()
+        assert pulled == {"main.py": _MAIN_PY}
+        
+        store.push(pulled)
+        assert (store.working_dir / "logo.png").read_bytes() == png
+        assert (store.working_dir / "data.bin").read_bytes() == blob
+    
+    def test_push_handles_partial_writes(self, disk_memory_dir, monkeypatch):
+        """Test qu'une écriture partielle d'os.write ne tronque pas le fichier."""
+        content = "ligne é\n" * 1000
+        real_write = os.write
+        monkeypatch.setattr(os, "write", lambda fd, data: real_write(fd, data[:5]))
+        
+        FileStore(disk_memory_dir).push(FilesDict({"main.py": content}))
+        
+        assert (disk_memory_dir / "main.py").read_text(encoding="utf-8") == content
+    
+    def test_push_skips_unchanged_files(self, disk_memory_dir):
+        """Test que les fichiers inchangés ne sont pas réécrits, sauf modification externe."""
+        store = FileStore(disk_memory_dir)
+        files = FilesDict({"main.py": "print(1)"})
+        main_py = disk_memory_dir / "main.py"
+        store.push(files)
+        
+        main_py.write_text("modification externe", encoding="utf-8")
+        store.push(files)
+        assert main_py.read_text(encoding="utf-8") == "print(1)"
+        
+        before = main_py.stat()
+        # Au-delà de la granularité des horodatages : une réécriture changerait mtime
+        time.sleep(0.05)
+        store.push(files)
+        after = main_py.stat()
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
 
 
-def test_package_import():
-    """Test que le package peut être importé correctement."""
-    import gpt_genius
+_TEST_PID = os.getpid()
+
+
+def _pid_linter(content, config):
+    """Linter de test qui retourne le PID du processus qui l'exécute."""
+    return str(os.getpid()), True
+
+
+def _worker_failing_linter(content, config):
+    """Linter de test qui échoue uniquement dans les processus de linting."""
+    if os.getpid() != _TEST_PID:
+        raise TypeError("erreur du linter")
+    return content, True
+
+
+class TestDiskExecutionEnv:
+    """Tests pour l'exécution de commandes dans le répertoire de travail."""
+    
+    def test_captures_output_and_return_code(self, disk_memory_dir):
+        """Test que stdout, stderr et le code de retour sont restitués séparément."""
+        env = DiskExecutionEnv(disk_memory_dir)
+        
+        stdout, stderr, returncode = env.run(
+            "echo sortie; echo erreur >&2; exit 3", verbose=False
+        )
+        
+        assert stdout == "sortie\n"
+        assert stderr == "erreur\n"
+        assert returncode == 3
+    
+    def test_timeout(self, disk_memory_dir):
+        """Test qu'une commande trop longue est interrompue."""
+        env = DiskExecutionEnv(disk_memory_dir)
+        
+        with pytest.raises(TimeoutError):
+            env.run("sleep 5", timeout=0.2, verbose=False)
+    
+    def test_large_output_is_quiet(self, disk_memory_dir, capsys):
+        """Test qu'une sortie volumineuse est capturée en entier sans rien afficher."""
+        env = DiskExecutionEnv(disk_memory_dir)
+        
+        stdout, stderr, returncode = env.run(
+            "python -c \"import sys; sys.stdout.write('x' * 1000000)\"", verbose=False
+        )
+        
+        assert stdout == "x" * 1000000
+        assert (stderr, returncode) == ("", 0)
+        assert capsys.readouterr().out == ""
+    
+    def test_does_not_wait_for_background_processes(self, disk_memory_dir):
+        """Test que la lecture s'arrête à la fin du processus, pas de ses descendants."""
+        env = DiskExecutionEnv(disk_memory_dir)
+        
+        start = time.monotonic()
+        stdout, _, returncode = env.run("(sleep 3 &); echo fini", verbose=False)
+        
+        assert (stdout, returncode) == ("fini\n", 0)
+        assert time.monotonic() - start < 2
+
+
+class TestFileUtils:
+    """Tests pour les utilitaires de lecture de fichiers."""
+    
+    def test_read_bytes_handles_short_reads(self, disk_memory_dir, monkeypatch):
+        """Test qu'une lecture partielle d'os.read ne tronque pas le fichier."""
+        from gpt_genius.core.default import file_utils
+        
+        data = bytes(range(256)) * 40
+        text = "ligne é\n" * 1000
+        (disk_memory_dir / "data.bin").write_bytes(data)
+        (disk_memory_dir / "notes.txt").write_text(text, encoding="utf-8")
+        real_read = os.read
+        monkeypatch.setattr(os, "read", lambda fd, n: real_read(fd, min(n, 7)))
+        
+        assert file_utils.read_bytes(str(disk_memory_dir / "data.bin")) == data
+        assert FileStore(disk_memory_dir).pull() == {"notes.txt": text}
+
+
+class TestLinting:
+    """Tests pour la classe Linting."""
+    
+    @staticmethod
+    def _large_files():
+        """Deux fichiers Python non formatés totalisant plus de PARALLEL_LINT_MIN_BYTES."""
+        line = "x=1  # " + "a" * 100 + "\n"
+        lines = PARALLEL_LINT_MIN_BYTES // len(line) // 2 + 1
+        return FilesDict({"a.py": line * lines, "b.py": line.replace("x", "y") * lines})
+    
+    def test_process_pool_path(self):
+        """Test que le linting en processus séparés donne le même résultat que black."""
+        import black
+        
+        files = self._large_files()
+        expected = {
+            name: black.format_str(content, mode=black.FileMode())
+            for name, content in files.items()
+        }
+        
+        assert Linting().lint_files(files) == expected
+        
+        linting = Linting()
+        linting.linters[".py"] = _pid_linter
+        pids = set(linting.lint_files(self._large_files()).values())
+        assert str(os.getpid()) not in pids
+    
+    def test_linter_errors_propagate(self):
+        """Test qu'une erreur d'un linter n'est pas masquée par un repli silencieux."""
+        linting = Linting()
+        linting.linters[".py"] = _worker_failing_linter
+        
+        with pytest.raises(TypeError, match="erreur du linter"):
+            linting.lint_files(self._large_files())
+    
+    def test_black_errors_are_reported_each_run(self, capsys):
+        """Test qu'un fichier que black ne peut pas formater n'est pas mis en cache."""
+        linting = Linting()
+        invalid = FilesDict({"broken.py": "def f(:\n"})
+        
+        for _ in range(2):
+            assert linting.lint_files(FilesDict(invalid)) == invalid
+            assert "Ne peut pas formater" in capsys.readouterr().out
+        
+        formatted = FilesDict({"ok.py": "x = 1\n"})
+        linting.lint_files(FilesDict(formatted))
+        capsys.readouterr()
+        linting.lint_files(FilesDict(formatted))
+        assert "Aucun changement n'a été fait" not in capsys.readouterr().out
+
+
+class _WhitespaceEncoder:
+    """Encodeur factice : un token par mot, sans accès réseau."""
+    
+    def __init__(self):
+        self.batch_calls = 0
     
-    assert hasattr(gpt_genius, 'AI')
-    assert hasattr(gpt_genius, 'Prompt')
-    assert hasattr(gpt_genius, 'FilesDict')
-    assert hasattr(gpt_genius, 'SimpleAgent')
-    assert gpt_genius.__version__ == "0.1.0"
\ No newline at end of file
+    def encode(self, text, **kwargs):
+        return text.split()
+    
+    def encode_ordinary(self, text):
+        return text.split()
+    
+    def encode_batch(self, texts, num_threads=1, **kwargs):
+        self.batch_calls += 1
+        return [text.split() for text in texts]
+
+
+@pytest.fixture
+def whitespace_encoder(monkeypatch):
+    """Remplace l'encodeur tiktoken, qui doit être téléchargé, par _WhitespaceEncoder."""
+    from gpt_genius.core import token_usage
+    
+    encoder = _WhitespaceEncoder()
+    monkeypatch.setattr(token_usage, "_get_encoder", lambda model_name: encoder)
+    return encoder
+
+
+def _api_error(error_class, status_code, headers=None):
+    """Construit une erreur de l'API OpenAI avec sa réponse HTTP."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return error_class("erreur simulée", response=response, body=None)
+
+
+class _FakeLLM:
+    """Modèle factice qui lève les erreurs prévues avant de répondre."""
+    
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+    
+    def invoke(self, messages, config=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return AIMessage(content=f"réponse à {messages[-1].content}")
+    
+    async def ainvoke(self, messages, config=None):
+        return self.invoke(messages, config)
+
+
+class _FakeBatches:
+    """Remplace `openai.batches` : chaque appel à retrieve renvoie le statut suivant."""
+    
+    def __init__(self, statuses, total=1):
+        self.statuses = list(statuses)
+        self.total = total
+        self.retrieved = 0
+        self.created = []
+    
+    def create(self, **kwargs):
+        self.created.append(kwargs)
+        return SimpleNamespace(id="batch-1")
+    
+    def retrieve(self, batch_id):
+        self.retrieved += 1
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return SimpleNamespace(
+            status=status,
+            output_file_id="sortie" if status == "completed" else None,
+            request_counts=SimpleNamespace(total=self.total),
+        )
+
+
+class _FakeFiles:
+    """Remplace `openai.files` : stocke le fichier soumis et sert la sortie du batch."""
+    
+    def __init__(self, output_lines):
+        self.output_lines = output_lines
+        self.uploaded = []
+    
+    def create(self, file, purpose):
+        self.uploaded.append(file[1].decode("utf-8"))
+        return SimpleNamespace(id="entree")
+    
+    def content(self, file_id):
+        return SimpleNamespace(text="\n".join(map(json.dumps, self.output_lines)))
+
+
+class TestAI:
+    """Tests pour la construction et les appels du modèle."""
+    
+    def test_llm_cache_follows_environment(self, monkeypatch):
+        """Test qu'un changement de clé d'API produit un nouveau client."""
+        from gpt_genius.core.ai import _build_llm
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-premiere")
+        first = _build_llm("gpt-4o", 0.1, None, True, True)
+        assert _build_llm("gpt-4o", 0.1, None, True, True) is first
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-seconde")
+        second = _build_llm("gpt-4o", 0.1, None, True, True)
+        assert second is not first
+        assert second.openai_api_key.get_secret_value() == "sk-seconde"
+    
+    @pytest.fixture
+    def ai(self, monkeypatch, whitespace_encoder):
+        from gpt_genius.core.ai import AI
+        
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.delenv("GPT_GENIUS_BATCH", raising=False)
+        return AI("gpt-4o", streaming=False)
+    
+    @pytest.fixture
+    def sleeps(self, monkeypatch):
+        """Enregistre les attentes de backoff au lieu de dormir."""
+        recorded = []
+        
+        async def fake_asleep(seconds):
+            recorded.append(seconds)
+        
+        monkeypatch.setattr(time, "sleep", recorded.append)
+        monkeypatch.setattr(asyncio, "sleep", fake_asleep)
+        return recorded
+    
+    def test_retry_after_is_honoured(self, ai, sleeps):
+        """Test que l'attente avant la nouvelle tentative couvre l'en-tête Retry-After."""
+        ai.llm = _FakeLLM([_api_error(openai.RateLimitError, 429, {"retry-after": "5"})])
+        
+        messages = ai.next([HumanMessage(content="bonjour")], step_name="test")
+        
+        assert messages[-1].content == "réponse à bonjour"
+        assert ai.llm.calls == 2
+        assert sum(sleeps) == pytest.approx(5)
+    
+    def test_gives_up_on_non_retryable_status(self, ai, sleeps):
+        """Test qu'une erreur serveur non transitoire n'est pas retentée."""
+        ai.llm = _FakeLLM([_api_error(openai.InternalServerError, 501)])
+        
+        with pytest.raises(openai.InternalServerError):
+            ai.next([HumanMessage(content="bonjour")], step_name="test")
+        
+        assert ai.llm.calls == 1
+        assert sleeps == []
+    
+    def test_abatch_retries_and_keeps_order(self, ai, sleeps):
+        """Test que abatch complète chaque conversation, dans l'ordre, avec backoff."""
+        ai.llm = _FakeLLM([_api_error(openai.InternalServerError, 503)])
+        conversations = [[HumanMessage(content=str(i))] for i in range(3)]
+        
+        results = asyncio.run(ai.abatch(conversations, step_name="test"))
+        
+        assert [r[-1].content for r in results] == [f"réponse à {i}" for i in range(3)]
+        assert ai.llm.calls == 4
+    
+    def test_batch_mode_is_explicit(self, ai, monkeypatch, whitespace_encoder):
+        """Test que le paramètre batch l'emporte sur la variable d'environnement."""
+        from gpt_genius.core.ai import AI
+        
+        monkeypatch.setenv("GPT_GENIUS_BATCH", "1")
+        
+        assert not ai.batch
+        assert AI("gpt-4o", streaming=False).batch
+        assert not AI("gpt-4o", streaming=False, batch=False).batch
+    
+    def test_next_through_batch_api(self, ai, monkeypatch, sleeps):
+        """Test que next soumet la conversation au batch puis attend sa fin."""
+        batches = _FakeBatches(["validating", "in_progress", "completed"])
+        output = {
+            "custom_id": "0",
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": "réponse du batch"}}]},
+            },
+        }
+        files = _FakeFiles([output])
+        monkeypatch.setattr(openai, "batches", batches)
+        monkeypatch.setattr(openai, "files", files)
+        ai.batch = True
+        
+        messages = ai.next([HumanMessage(content="bonjour")], step_name="test")
+        
+        assert messages[-1].content == "réponse du batch"
+        assert json.loads(files.uploaded[0])["body"]["messages"] == [
+            {"role": "user", "content": "bonjour"}
+        ]
+        assert batches.retrieved == 3
+        assert sleeps == [BATCH_POLL_INTERVAL] * 2
+    
+    def test_abatch_through_batch_api(self, ai, monkeypatch):
+        """Test qu'en mode batch, abatch soumet toutes les conversations en un seul batch."""
+        outputs = [
+            {
+                "custom_id": str(i),
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"content": f"réponse {i}"}}]},
+                },
+            }
+            for i in range(2)
+        ]
+        batches = _FakeBatches(["completed"], total=2)
+        files = _FakeFiles(outputs)
+        monkeypatch.setattr(openai, "batches", batches)
+        monkeypatch.setattr(openai, "files", files)
+        ai.batch = True
+        ai.llm = _FakeLLM([AssertionError("appel direct au modèle en mode batch")])
+        conversations = [[HumanMessage(content=str(i))] for i in range(2)]
+        
+        results = asyncio.run(ai.abatch(conversations, step_name="test"))
+        
+        assert [r[-1].content for r in results] == ["réponse 0", "réponse 1"]
+        assert len(batches.created) == 1
+        assert len(files.uploaded[0].splitlines()) == 2
+    
+    def test_submit_batch_rejects_unsupported_messages(self, ai):
+        """Test qu'un message sans rôle OpenAI équivalent lève une erreur explicite."""
+        from langchain.schema import FunctionMessage
+        
+        with pytest.raises(ValueError, match="function"):
+            ai.submit_batch([[FunctionMessage(content="{}", name="outil")]])
+    
+    def test_wait_for_batch_failure(self, ai, monkeypatch):
+        """Test qu'un batch expiré lève une erreur au lieu d'attendre indéfiniment."""
+        monkeypatch.setattr(openai, "batches", _FakeBatches(["in_progress", "expired"]))
+        
+        with pytest.raises(RuntimeError, match="expired"):
+            ai.wait_for_batch("batch-1", poll=0)
+    
+    def test_wait_for_batch_timeout(self, ai, monkeypatch):
+        """Test que l'attente d'un batch est bornée par le timeout."""
+        batches = _FakeBatches(["in_progress"])
+        monkeypatch.setattr(openai, "batches", batches)
+        
+        with pytest.raises(TimeoutError, match="in_progress"):
+            ai.wait_for_batch("batch-1", poll=0.01, timeout=0.05)
+        
+        assert 1 < batches.retrieved <= 6
+
+
+class TestTokenUsage:
+    """Tests pour le comptage des tokens."""
+    
+    def test_usage_cost_without_usage(self, whitespace_encoder):
+        """Test qu'un journal vide coûte 0.0, même pour un modèle sans tarif connu."""
+        from gpt_genius.core.token_usage import TokenUsageLog
+        
+        log = TokenUsageLog("gpt-inconnu")
+        assert log.usage_cost() == 0.0
+        
+        log.update_log([HumanMessage(content="bonjour")], "réponse", step_name="test")
+        assert log.usage_cost() is None
+    
+    @pytest.fixture
+    def tokenizer(self, whitespace_encoder):
+        from gpt_genius.core.token_usage import Tokenizer
+        
+        return Tokenizer("gpt-4o"), whitespace_encoder
+    
+    @staticmethod
+    def _baseline(messages):
+        # Calcul message par message, comme avant le regroupement des textes
+        return sum(4 + len(message.content.split()) + 2 for message in messages)
+    
+    @pytest.mark.parametrize("words", [10, 20000])
+    def test_matches_per_message_count(self, tokenizer, words):
+        """Test que le comptage groupé ou non donne le même total qu'au message près."""
+        from langchain.schema import AIMessage, HumanMessage, SystemMessage
+        from gpt_genius.core.token_usage import ENCODE_BATCH_MIN_CHARS
+        
+        tok, encoder = tokenizer
+        messages = [
+            SystemMessage(content="mot " * words),
+            HumanMessage(content="autre mot " * words),
+            AIMessage(content="réponse"),
+        ]
+        
+        assert tok.num_tokens_from_messages(messages) == self._baseline(messages)
+        large = sum(len(message.content) for message in messages) >= ENCODE_BATCH_MIN_CHARS
+        assert encoder.batch_calls == int(large)
+
+
+class TestPrepromptsHolder:
+    """Tests pour la classe PrepromptsHolder."""
+    
+    def test_sees_in_place_edits(self, disk_memory_dir):
+        """Test qu'un preprompt modifié sur place est relu malgré le cache."""
+        preprompt = disk_memory_dir / "roadmap"
+        preprompt.write_text("v1", encoding="utf-8")
+        os.utime(preprompt, ns=(0, 0))
+        holder = PrepromptsHolder(disk_memory_dir)
+        assert holder.get_preprompts() == {"roadmap": "v1"}
+        
+        preprompt.write_text("v2", encoding="utf-8")
+        
+        assert holder.get_preprompts() == {"roadmap": "v2"}
+
+
+class TestSteps:
+    """Tests pour les étapes de génération."""
+    
+    def test_log_lazy_falls_back_to_log(self):
+        """Test qu'une mémoire ne proposant que log reçoit le contenu construit."""
+        from gpt_genius.core.default.steps import _log_lazy
+        
+        class LogOnlyMemory(dict):
+            def log(self, key, val):
+                self[key] = self.get(key, "") + val
+        
+        memory = LogOnlyMemory()
+        _log_lazy(memory, "gen_code.log", lambda: "contenu")
+        
+        assert memory == {"gen_code.log": "contenu"}
+    
+    def test_log_lazy_skips_producer_when_disabled(self, disk_memory_dir):
+        """Test que le contenu n'est pas construit quand DiskMemory ne journalise pas."""
+        from gpt_genius.core.default.steps import _log_lazy
+        
+        def producer():
+            raise AssertionError("contenu construit inutilement")
+        
+        _log_lazy(DiskMemory(disk_memory_dir, log_enabled=False), "gen_code.log", producer)
+
+
+class TestSimpleAgent:
+    """Tests pour la génération en streaming de SimpleAgent."""
+    
+    def test_retry_discards_files_of_failed_attempt(self, disk_memory_dir):
+        """Test qu'après un échec en plein flux, seuls les fichiers de la réponse finale restent."""
+        from gpt_genius.core.default.simple_agent import SimpleAgent
+        
+        project = disk_memory_dir / "projet"
+        project.mkdir()
+        (project / "notes.txt").write_text("à garder", encoding="utf-8")
+        failed_tokens = ["orphan.py\n```\nx = 1\n```\n", "notes.txt\n```\nécrasé\n```\n"]
+        final_chat = "main.py\n```python\nprint('ok')\n```\n"
+        
+        class RetryingAI:
+            """Simule une première tentative interrompue puis une seconde complète."""
+            
+            def start(self, system, user, *, step_name, callbacks=None):
+                handler = callbacks[0]
+                handler.on_chat_model_start({}, [])
+                for token in failed_tokens:
+                    handler.on_llm_new_token(token)
+                handler.on_chat_model_start({}, [])
+                handler.on_llm_new_token(final_chat)
+                handler.on_llm_end(None)
+                return [HumanMessage(content=user), AIMessage(content=final_chat)]
+        
+        agent = SimpleAgent(
+            memory=DiskMemory(disk_memory_dir / "memoire"),
+            execution_env=DiskExecutionEnv(disk_memory_dir / "exec"),
+            ai=RetryingAI(),
+            file_store=FileStore(project),
+        )
+        
+        files_dict = agent._gen_code_streaming(Prompt("une application"))
+        
+        assert files_dict == {"main.py": "print('ok')"}
+        assert sorted(os.listdir(project)) == ["main.py", "notes.txt"]
+        assert (project / "notes.txt").read_text(encoding="utf-8") == "à garder"
+        assert (project / "main.py").read_text(encoding="utf-8") == "print('ok')"
+
+
+def test_package_import(gpt_genius_module):
+    """Test que le package peut être importé correctement."""
+    expected = {"AI", "Prompt", "FilesDict", "SimpleAgent"}
+    assert not expected - set(dir(gpt_genius_module))
+    # Exports chargés à la demande (PEP 562) : chacun doit se résoudre à l'import
+    exported = vars(gpt_genius_module)
+    for name in expected - exported.keys():
+        getattr(gpt_genius_module, name)
+    assert not expected - exported.keys()
+    assert exported["__version__"] == "0.1.0"
\ No newline at end of file